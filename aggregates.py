@@ -0,0 +1,142 @@
+import math
+from collections import OrderedDict
+import numpy as np
+from lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_HOUR = 60 * NS_PER_MINUTE
+
+
+class RollingStats:
+    """Mean/std/min/max of the last ``window`` values, updated in O(1)."""
+
+    def __init__(self, window=100):
+        self.window = window
+        self._buf = np.zeros(window, np.float64)
+        self._i = 0
+        self.n = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def push(self, value):
+        if self.n == self.window:
+            old = self._buf[self._i]
+            self._sum -= old
+            self._sumsq -= old * old
+        else:
+            self.n += 1
+        self._buf[self._i] = value
+        self._sum += value
+        self._sumsq += value * value
+        self._i = (self._i + 1) % self.window
+
+    @property
+    def mean(self):
+        return self._sum / self.n if self.n else float('nan')
+
+    @property
+    def std(self):
+        if self.n < 2:
+            return 0.0
+        return math.sqrt(max(self._sumsq / self.n - self.mean ** 2, 0.0))
+
+
+class TimeBuckets:
+    """Count/mean/min/max confidence plus per-category counts per time bucket.
+
+    Only the newest ``keep`` buckets are retained.
+    """
+
+    def __init__(self, width_ns, keep, n_categories):
+        self.width_ns = width_ns
+        self.keep = keep
+        self.n_categories = n_categories
+        self._buckets = OrderedDict()
+
+    def add(self, ts, category, confidence):
+        start = ts - ts % self.width_ns
+        b = self._buckets.get(start)
+        if b is None:
+            b = self._buckets[start] = {'count': 0, 'conf_sum': 0.0, 'conf_min': 1.0, 'conf_max': 0.0,
+                                        'by_category': np.zeros(self.n_categories, np.int64)}
+            if len(self._buckets) > self.keep:
+                self._buckets.popitem(last=False)
+        b['count'] += 1
+        b['conf_sum'] += confidence
+        b['conf_min'] = min(b['conf_min'], confidence)
+        b['conf_max'] = max(b['conf_max'], confidence)
+        b['by_category'][category] += 1
+
+    def frame(self, categories):
+        starts = list(self._buckets)
+        rows = list(self._buckets.values())
+        df = pd.DataFrame({
+            'bucket': pd.to_datetime(np.array(starts, np.int64)),
+            'count': [b['count'] for b in rows],
+            'conf_mean': [b['conf_sum'] / b['count'] for b in rows],
+            'conf_min': [b['conf_min'] for b in rows],
+            'conf_max': [b['conf_max'] for b in rows],
+        })
+        by_cat = np.array([b['by_category'] for b in rows], np.int64).reshape(len(rows), self.n_categories)
+        for j, name in enumerate(categories):
+            df[name] = by_cat[:, j]
+        return df
+
+
+class Aggregates:
+    """Dashboard aggregates maintained per detection, independent of history length.
+
+    Keeps totals per defect class, severity and machine, overall and
+    rolling confidence statistics, and per-minute/per-hour rollups.
+    """
+
+    def __init__(self, defect_classes, severities, machines, window=100,
+                 keep_minutes=24 * 60, keep_hours=30 * 24):
+        self.defect_classes = defect_classes
+        self.severities = severities
+        self.machines = machines
+        self.defect_counts = np.zeros(len(defect_classes), np.int64)
+        self.severity_counts = np.zeros(len(severities), np.int64)
+        self.machine_counts = np.zeros(len(machines), np.int64)
+        self.machine_defect_counts = np.zeros((len(machines), len(defect_classes)), np.int64)
+        self.rolling = RollingStats(window)
+        self.n = 0
+        self.conf_mean = 0.0
+        self._conf_m2 = 0.0
+        self.per_minute = TimeBuckets(NS_PER_MINUTE, keep_minutes, len(defect_classes))
+        self.per_hour = TimeBuckets(NS_PER_HOUR, keep_hours, len(defect_classes))
+
+    def update(self, defect, severity, machine, confidence, ts):
+        """Fold in one detection given its category codes and int64 ns timestamp."""
+        self.defect_counts[defect] += 1
+        self.severity_counts[severity] += 1
+        self.machine_counts[machine] += 1
+        self.machine_defect_counts[machine, defect] += 1
+        self.rolling.push(confidence)
+        # Welford's running mean/variance over the whole history
+        self.n += 1
+        delta = confidence - self.conf_mean
+        self.conf_mean += delta / self.n
+        self._conf_m2 += delta * (confidence - self.conf_mean)
+        self.per_minute.add(ts, defect, confidence)
+        self.per_hour.add(ts, defect, confidence)
+
+    @property
+    def conf_std(self):
+        return math.sqrt(self._conf_m2 / self.n) if self.n > 1 else 0.0
+
+    def defect_series(self):
+        return pd.Series(self.defect_counts, index=self.defect_classes)
+
+    def severity_series(self):
+        return pd.Series(self.severity_counts, index=self.severities)
+
+    def machine_series(self):
+        return pd.Series(self.machine_counts, index=self.machines)
+
+    def rollup(self, freq='minute'):
+        """Time-bucketed counts and confidence stats; ``freq`` is 'minute' or 'hour'."""
+        buckets = self.per_minute if freq == 'minute' else self.per_hour
+        return buckets.frame(self.defect_classes)
@@ -0,0 +1,218 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from batcher import BackgroundBatcher
+from detector import ACTIONS
+from lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+ANALYTICS_DB = os.environ.get('STEELSENSE_ANALYTICS_DB',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analytics.db'))
+
+# Group-by choices for ``query``: label -> SQL expression over the rollup tables
+GROUPS = {
+    'day': 'date',
+    'week': "strftime('%Y-W%W', date)",
+    'month': 'substr(date, 1, 7)',
+    'machine': 'machine_code',
+    'defect': 'defect_type',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    date TEXT NOT NULL,
+    machine_code TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    n_defects INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS defects (
+    id INTEGER PRIMARY KEY,
+    part_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    date TEXT NOT NULL,
+    machine_code TEXT NOT NULL,
+    defect_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    confidence REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_parts_machine_date ON parts (machine_code, date);
+CREATE INDEX IF NOT EXISTS idx_defects_machine_date_type ON defects (machine_code, date, defect_type);
+CREATE TABLE IF NOT EXISTS daily_parts (
+    machine_code TEXT NOT NULL,
+    date TEXT NOT NULL,
+    parts INTEGER NOT NULL,
+    rejected INTEGER NOT NULL,
+    reworked INTEGER NOT NULL,
+    PRIMARY KEY (machine_code, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_defects (
+    machine_code TEXT NOT NULL,
+    date TEXT NOT NULL,
+    defect_type TEXT NOT NULL,
+    detections INTEGER NOT NULL,
+    parts_affected INTEGER NOT NULL,
+    conf_sum REAL NOT NULL,
+    PRIMARY KEY (machine_code, date, defect_type)
+) WITHOUT ROWID;
+"""
+
+
+class AnalyticsStore(BackgroundBatcher):
+    """Local SQLite history of every inspected part, with daily rollups.
+
+    ``record`` only enqueues; a background thread writes batches in one
+    transaction each and folds them into the ``daily_parts`` and
+    ``daily_defects`` rollups in the same transaction, so range and
+    group-by questions are answered from a few thousand rollup rows no
+    matter how many raw detections are stored. Raw rows stay available
+    for drill-down through the (machine_code, date, defect_type) index.
+    """
+
+    def __init__(self, path=ANALYTICS_DB, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.written = 0
+        self.last_error = None
+        self._writer = self._connect()
+        self._writer.executescript(SCHEMA)
+        self._reader = self._connect()
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        super().__init__('analytics-writer', batch_size, flush_interval)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        # WAL lets the dashboard read while the writer commits
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # ── writing ──
+    def record(self, machine_code, detections, verdict, ts=None):
+        """Queue one inspected part and its detections."""
+        ts = time.time() if ts is None else ts
+        self.submit((ts, datetime.fromtimestamp(ts).strftime('%Y-%m-%d'), machine_code, verdict,
+                         [(d['class'], ACTIONS[d['class']][0], float(d['confidence'])) for d in detections]))
+
+    def _handle(self, rows):
+        try:
+            if rows:
+                self._write(rows)
+        except sqlite3.Error as e:
+            self.last_error = str(e)
+
+    def _close(self, rows):
+        if rows:
+            self._write(rows)
+        self._writer.close()
+        self._reader.close()
+
+    def write_batch(self, parts):
+        """Commit ``(ts, date, machine_code, verdict, [(defect_type, severity, confidence)])`` rows now.
+
+        Bypasses the queue; meant for bulk imports and backfills.
+        """
+        self._write(parts)
+
+    def _write(self, parts):
+        day_parts = defaultdict(lambda: [0, 0, 0])
+        day_defects = defaultdict(lambda: [0, 0, 0.0])
+        defect_rows = []
+        with self._write_lock, self._writer:
+            cur = self._writer.cursor()
+            for ts, date, machine, verdict, dets in parts:
+                cur.execute('INSERT INTO parts (ts, date, machine_code, verdict, n_defects) VALUES (?, ?, ?, ?, ?)',
+                            (ts, date, machine, verdict, len(dets)))
+                part_id = cur.lastrowid
+                dp = day_parts[machine, date]
+                dp[0] += 1
+                dp[1] += verdict == 'REJECT'
+                dp[2] += verdict == 'REWORK'
+                for defect_type in {d[0] for d in dets}:
+                    day_defects[machine, date, defect_type][1] += 1
+                for defect_type, severity, conf in dets:
+                    defect_rows.append((part_id, ts, date, machine, defect_type, severity, conf))
+                    dd = day_defects[machine, date, defect_type]
+                    dd[0] += 1
+                    dd[2] += conf
+            cur.executemany('INSERT INTO defects (part_id, ts, date, machine_code, defect_type, severity, confidence) '
+                            'VALUES (?, ?, ?, ?, ?, ?, ?)', defect_rows)
+            cur.executemany(
+                'INSERT INTO daily_parts VALUES (?, ?, ?, ?, ?) ON CONFLICT (machine_code, date) DO UPDATE SET '
+                'parts = parts + excluded.parts, rejected = rejected + excluded.rejected, '
+                'reworked = reworked + excluded.reworked',
+                [(m, d, *v) for (m, d), v in day_parts.items()])
+            cur.executemany(
+                'INSERT INTO daily_defects VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (machine_code, date, defect_type) '
+                'DO UPDATE SET detections = detections + excluded.detections, '
+                'parts_affected = parts_affected + excluded.parts_affected, conf_sum = conf_sum + excluded.conf_sum',
+                [(m, d, t, *v) for (m, d, t), v in day_defects.items()])
+        self.written += len(parts)
+
+    # ── reading ──
+    def _read(self, sql, params=()):
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _where(machines=None, start=None, end=None, defect_types=None):
+        clauses, params = [], []
+        for column, values in (('machine_code', machines), ('defect_type', defect_types)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if start:
+            clauses.append('date >= ?')
+            params.append(str(start))
+        if end:
+            clauses.append('date <= ?')
+            params.append(str(end))
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def totals(self):
+        """Stored parts and detections; uses the rowids, so it is O(1) at any size."""
+        parts = self._read('SELECT MAX(id) FROM parts')[0][0] or 0
+        defects = self._read('SELECT MAX(id) FROM defects')[0][0] or 0
+        return parts, defects
+
+    def query(self, group_by='day', machines=None, defect_types=None, start=None, end=None):
+        """Parts, detections, share of parts affected and mean confidence per group, from the rollups.
+
+        ``machines``/``defect_types`` are lists (empty means all); ``start``
+        and ``end`` are inclusive dates. ``rate`` is parts affected over parts
+        inspected, summed across the selected defect types; the part count is
+        not narrowed by ``defect_types``.
+        """
+        key = GROUPS[group_by]
+        pwhere, pparams = self._where(machines, start, end)
+        dwhere, dparams = self._where(machines, start, end, defect_types)
+        defects = self._read(f'SELECT {key} AS grp, SUM(detections), SUM(parts_affected), SUM(conf_sum) '
+                             f'FROM daily_defects {dwhere} GROUP BY grp', dparams)
+        if group_by == 'defect':
+            total = self._read(f'SELECT SUM(parts) FROM daily_parts {pwhere}', pparams)[0][0] or 0
+            parts = {grp: total for grp, *_ in defects}
+        else:
+            parts = {grp: n for grp, n in self._read(
+                f'SELECT {key} AS grp, SUM(parts) FROM daily_parts {pwhere} GROUP BY grp', pparams)}
+        by_group = {grp: (n, affected, conf_sum) for grp, n, affected, conf_sum in defects}
+        rows = []
+        for grp in sorted(set(parts) | set(by_group)):
+            n_parts = parts.get(grp, 0)
+            n, affected, conf_sum = by_group.get(grp, (0, 0, 0.0))
+            rows.append({group_by: grp, 'parts': n_parts, 'detections': n,
+                         'parts_affected': affected,
+                         'rate': round(affected / n_parts, 4) if n_parts else None,
+                         'conf_mean': round(conf_sum / n, 4) if n else None})
+        return pd.DataFrame(rows, columns=[group_by, 'parts', 'detections', 'parts_affected', 'rate', 'conf_mean'])
+
+    def recent(self, machines=None, defect_types=None, start=None, end=None, limit=100):
+        """Newest raw detections matching the filters, served from the composite index."""
+        where, params = self._where(machines, start, end, defect_types)
+        rows = self._read(f'SELECT date, time(ts, \'unixepoch\', \'localtime\'), machine_code, defect_type, '
+                          f'severity, confidence FROM defects {where} ORDER BY id DESC LIMIT ?', params + [limit])
+        return pd.DataFrame(rows, columns=['date', 'time', 'machine_code', 'defect_type', 'severity', 'confidence'])
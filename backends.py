@@ -0,0 +1,151 @@
+import abc
+import ast
+import os
+import numpy as np
+from tiling import NMS_IOU, nms
+
+# 'auto' picks by model file: .pt -> ultralytics, .onnx -> onnx, .xml or an
+# *_openvino_model directory -> openvino. Each runtime (torch/ultralytics,
+# onnxruntime, openvino) is only imported when its backend is selected.
+BACKEND = os.environ.get('STEELSENSE_BACKEND', 'auto')
+BACKENDS = ['ultralytics', 'onnx', 'openvino']
+
+
+def resolve_backend(model_path, backend=BACKEND):
+    if backend != 'auto':
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)} or 'auto'")
+        return backend
+    if model_path.endswith('.onnx'):
+        return 'onnx'
+    if model_path.endswith('.xml') or os.path.isdir(model_path):
+        return 'openvino'
+    return 'ultralytics'
+
+
+def decode_yolo(output, conf, iou=NMS_IOU):
+    """Raw YOLOv8 head output ``(N, 4 + classes, anchors)`` -> per-image (xyxy, conf, class).
+
+    Boxes are in the letterboxed input frame, thresholded and NMS-merged.
+    """
+    results = []
+    for pred in output:
+        pred = pred.T
+        scores = pred[:, 4:]
+        classes = scores.argmax(1)
+        best = scores[np.arange(len(classes)), classes]
+        keep = best >= conf
+        cxcy, wh, best, classes = pred[keep, :2], pred[keep, 2:4], best[keep], classes[keep]
+        xyxy = np.concatenate([cxcy - wh / 2, cxcy + wh / 2], axis=1)
+        k = nms(xyxy, best, classes, iou)
+        results.append((xyxy[k], best[k], classes[k]))
+    return results
+
+
+def parse_names(raw, default):
+    # Ultralytics stores class names as the repr of a {id: name} dict
+    try:
+        names = ast.literal_eval(raw) if isinstance(raw, str) else raw
+        return {int(k): str(v) for k, v in names.items()}
+    except (ValueError, SyntaxError, AttributeError):
+        return default
+
+
+def _read_metadata_names(model_dir, default):
+    # Ultralytics writes metadata.yaml next to exported OpenVINO models
+    path = os.path.join(model_dir, 'metadata.yaml')
+    try:
+        import yaml
+        with open(path, encoding='utf-8') as f:
+            return parse_names(yaml.safe_load(f).get('names'), default)
+    except (ImportError, OSError, AttributeError):
+        return default
+
+
+class UltralyticsBackend:
+    """PyTorch weights through ultralytics; the original inference path."""
+
+    name = 'ultralytics'
+
+    def __init__(self, model_path, imgsz, threads, names):
+        import torch
+        torch.set_num_threads(threads)
+        from ultralytics import YOLO
+        self.imgsz = imgsz
+        self.model = YOLO(model_path)
+        self.names = self.model.names or names
+
+    def predict(self, batch, conf):
+        import torch
+        tensor = torch.from_numpy(batch).permute(0, 3, 1, 2).float().div_(255)
+        preds = self.model.predict(tensor, imgsz=self.imgsz, conf=conf, verbose=False)
+        return [(p.boxes.xyxy.cpu().numpy(), p.boxes.conf.cpu().numpy(), p.boxes.cls.cpu().numpy().astype(int))
+                for p in preds]
+
+
+class _ExportedBackend(abc.ABC):
+    """Shared pre/post-processing for runtimes that return the raw YOLO head output."""
+
+    max_batch = None
+
+    @abc.abstractmethod
+    def _run(self, x):
+        """Run one NCHW float32 batch of at most ``max_batch`` images; return the raw head output."""
+
+    def predict(self, batch, conf):
+        x = np.ascontiguousarray(batch.transpose(0, 3, 1, 2), np.float32) / 255
+        if self.max_batch is None:
+            output = self._run(x)
+        else:
+            # Models exported without dynamic=True only take a fixed batch per run
+            output = np.concatenate([self._run(x[i:i + self.max_batch]) for i in range(0, len(x), self.max_batch)])
+        return decode_yolo(output, conf)
+
+
+class OnnxBackend(_ExportedBackend):
+    """ONNX Runtime on CPU, for exported (optionally INT8-quantized) models; no torch import."""
+
+    name = 'onnx'
+
+    def __init__(self, model_path, imgsz, threads, names):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, opts, providers=['CPUExecutionProvider'])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        if isinstance(inp.shape[0], int):
+            self.max_batch = inp.shape[0]
+        self.names = parse_names(self.session.get_modelmeta().custom_metadata_map.get('names'), names)
+
+    def _run(self, x):
+        return self.session.run(None, {self.input_name: x})[0]
+
+
+class OpenVinoBackend(_ExportedBackend):
+    """OpenVINO runtime on CPU; reads an exported .xml/.bin pair (FP32 or INT8)."""
+
+    name = 'openvino'
+
+    def __init__(self, model_path, imgsz, threads, names):
+        import openvino as ov
+        if os.path.isdir(model_path):
+            model_path = next(os.path.join(model_path, f) for f in sorted(os.listdir(model_path)) if f.endswith('.xml'))
+        core = ov.Core()
+        model = core.read_model(model_path)
+        self.compiled = core.compile_model(model, 'CPU', {'INFERENCE_NUM_THREADS': threads})
+        self.output = self.compiled.output(0)
+        batch_dim = model.input(0).get_partial_shape()[0]
+        if batch_dim.is_static:
+            self.max_batch = batch_dim.get_length()
+        self.names = _read_metadata_names(os.path.dirname(model_path), names)
+
+    def _run(self, x):
+        return self.compiled(x)[self.output]
+
+
+def load_backend(model_path, imgsz, threads, names, backend=BACKEND):
+    kind = resolve_backend(model_path, backend)
+    cls = {'ultralytics': UltralyticsBackend, 'onnx': OnnxBackend, 'openvino': OpenVinoBackend}[kind]
+    return cls(model_path, imgsz, threads, names)
@@ -0,0 +1,100 @@
+import os
+import time
+import zipfile
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from imaging import PREVIEW_SIDE, decode_image, draw_detections
+from timing import StageTimer
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _is_image(name):
+    base = os.path.basename(name)
+    return base.lower().endswith(IMAGE_EXTS) and not base.startswith('.')
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def collect_jobs(uploads=(), folder=None):
+    """Return ``(name, loader)`` pairs for every image in the uploads and folder.
+
+    Loaders read the bytes lazily so a 2,000 image audit never sits in
+    memory all at once.
+    """
+    jobs = []
+    for up in uploads or ():
+        if up.name.lower().endswith('.zip'):
+            zf = zipfile.ZipFile(up)
+            for info in zf.infolist():
+                if not info.is_dir() and _is_image(info.filename) and '__MACOSX' not in info.filename:
+                    jobs.append((info.filename, lambda zf=zf, info=info: zf.read(info)))
+        elif _is_image(up.name):
+            jobs.append((up.name, up.getvalue))
+    if folder:
+        for root, _, files in os.walk(folder):
+            for f in sorted(files):
+                if _is_image(f):
+                    path = os.path.join(root, f)
+                    jobs.append((os.path.relpath(path, folder), lambda path=path: _read_file(path)))
+    return jobs
+
+
+def _decode(name, loader):
+    timer = StageTimer()
+    res = {'name': name, 'image': None, 'detections': [], 'annotated': None, 'error': None, 'timings': timer.timings}
+    try:
+        with timer.stage('decode'):
+            res['image'] = decode_image(loader())
+    except Exception as e:
+        res['error'] = str(e)
+    return res
+
+
+def _annotate(res):
+    if res['detections']:
+        with StageTimer(res['timings']).stage('draw'):
+            res['annotated'] = draw_detections(res['image'], res['detections'], max_side=PREVIEW_SIDE)
+    res['image'] = None
+    return res
+
+
+def run_batch(jobs, detect_batch, workers=None, batch_size=8):
+    """Stream inspection results in input order.
+
+    Decoding and annotation run on a worker pool while the detector sees
+    ``batch_size`` frames per forward pass; annotating one batch overlaps
+    with detecting the next. At most ``2 * workers`` images wait decoded,
+    which bounds memory no matter how many jobs are queued. Logging is
+    left to the caller so it can touch session state from the main thread.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    jobs = iter(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        decoding = deque(pool.submit(_decode, *job) for job in islice(jobs, max(workers * 2, batch_size)))
+        annotating = deque()
+        while decoding:
+            batch = []
+            while decoding and len(batch) < batch_size:
+                batch.append(decoding.popleft().result())
+                job = next(jobs, None)
+                if job is not None:
+                    decoding.append(pool.submit(_decode, *job))
+            ok = [r for r in batch if r['error'] is None]
+            if ok:
+                start = time.perf_counter()
+                detections = detect_batch([r['image'] for r in ok])
+                # One forward pass serves the whole batch; charge each image its share
+                share = (time.perf_counter() - start) * 1000 / len(ok)
+                for res, dets in zip(ok, detections):
+                    res['detections'] = dets
+                    res['timings']['detect'] = share
+            while annotating:
+                yield annotating.popleft().result()
+            annotating.extend(pool.submit(_annotate, r) for r in batch)
+        while annotating:
+            yield annotating.popleft().result()
@@ -0,0 +1,72 @@
+import abc
+import atexit
+import queue
+import threading
+
+
+class BackgroundBatcher(abc.ABC):
+    """Queue drained in batches by a daemon thread, closed at interpreter exit.
+
+    Subclasses implement ``_handle(items)``, called on the worker thread
+    with up to ``batch_size`` items at least every ``flush_interval``
+    seconds (with an empty list when nothing arrived, so it can do
+    periodic work), and ``_close(items)``, called once by ``close`` with
+    whatever was still queued after the worker stopped. The worker starts
+    in ``__init__``, so subclasses call it after setting up their state.
+    """
+
+    def __init__(self, name, batch_size, flush_interval, join_timeout=10):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._join_timeout = join_timeout
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, item):
+        self._queue.put(item)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until every submitted item has been handled."""
+        self._queue.join()
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(self._join_timeout)
+        self._close(self._drain(block=False))
+
+    @abc.abstractmethod
+    def _handle(self, items):
+        ...
+
+    @abc.abstractmethod
+    def _close(self, items):
+        ...
+
+    def _run(self):
+        while not self._stop.is_set():
+            items = self._drain(block=True)
+            try:
+                self._handle(items)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _drain(self, block):
+        items = []
+        try:
+            if block:
+                items.append(self._queue.get(timeout=self.flush_interval))
+            while len(items) < self.batch_size:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return items
@@ -0,0 +1,67 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def image_key(image_array, *parts):
+    """Hash the decoded pixel buffer together with anything else the result depends on."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((image_array.shape, image_array.dtype.str) + parts).encode())
+    h.update(memoryview(np.ascontiguousarray(image_array)).cast('B'))
+    return h.hexdigest()
+
+
+def sizeof(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the total size of its values in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        """Insert or refresh ``key``; values larger than the whole budget are not cached."""
+        size = sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
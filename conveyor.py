@@ -0,0 +1,49 @@
+import json
+import os
+from collections import deque
+import streamlit as st
+import streamlit.components.v1 as components
+from detector import ACTIONS
+
+COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'components', 'conveyor')
+_conveyor = components.declare_component('conveyor', path=COMPONENT_DIR)
+
+# Detections sent per part; the 3D log shows the top one and a count
+EVENT_DEFECTS = 3
+
+
+class ConveyorFeed:
+    """Inspection events for the 3D conveyor component, sent incrementally.
+
+    The component page loads once per session. Each render passes only the
+    events it has not acknowledged yet (a few hundred bytes), and the page
+    answers with the last sequence number it applied.
+    """
+
+    def __init__(self, maxlen=50):
+        self.seq = 0
+        self.epoch = 0
+        self._events = deque(maxlen=maxlen)
+
+    def push(self, machine_code, detections, verdict):
+        self.seq += 1
+        top = sorted(detections, key=lambda d: -d['confidence'])[:EVENT_DEFECTS]
+        self._events.append({
+            'seq': self.seq, 'machine': machine_code, 'verdict': verdict, 'n': len(detections),
+            'defects': [{'class': d['class'], 'severity': ACTIONS[d['class']][0],
+                         'confidence': round(float(d['confidence']), 3)} for d in top],
+        })
+
+    def reset(self):
+        """Clear the view's counters and log on the next render."""
+        self.epoch += 1
+        self._events.clear()
+
+    def render(self, key='conveyor_view', height=700):
+        ack = st.session_state.get(key) or {}
+        while self._events and self._events[0]['seq'] <= ack.get('ack', 0):
+            self._events.popleft()
+        # Sent as JSON text: list arguments go through Streamlit's dataframe
+        # check, which imports pandas and pyarrow on the first run
+        events = json.dumps(list(self._events), separators=(',', ':'))
+        _conveyor(events=events, epoch=self.epoch, height=height, key=key, default=None)
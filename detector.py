@@ -0,0 +1,151 @@
+import os
+import threading
+import numpy as np
+from backends import BACKEND, load_backend
+from lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+
+# ─── Defect Classes & Actions ─────────────────────────────────────────────────
+DEFECT_CLASSES = ['crazing', 'inclusion', 'patches', 'pitting', 'rolled-in_scale', 'scratches']
+
+ACTIONS = {
+    'crazing':         ('CRITICAL', '🔴', 'Reject - Send for re-melting. Check cooling rate.'),
+    'inclusion':       ('CRITICAL', '🔴', 'Reject - Foreign material detected. Review raw intake.'),
+    'patches':         ('MEDIUM',   '🟡', 'Rework - Surface treatment required. Schedule grinding.'),
+    'pitting':         ('MEDIUM',   '🟡', 'Rework - Chemical treatment needed. Check storage.'),
+    'rolled-in_scale': ('MEDIUM',   '🟡', 'Rework - Rolling process adjustment needed.'),
+    'scratches':       ('LOW',      '🟢', 'Accept with caution - Minor surface grinding at zone.')
+}
+
+# ─── Model Config ─────────────────────────────────────────────────────────────
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(BASE_DIR, 'best.pt')
+MODEL_PATH = os.environ.get('STEELSENSE_MODEL', DEFAULT_MODEL_PATH)
+IMG_SIZE = int(os.environ.get('STEELSENSE_IMGSZ', 640))
+CPU_THREADS = int(os.environ.get('STEELSENSE_THREADS', os.cpu_count() or 1))
+BATCH_SIZE = int(os.environ.get('STEELSENSE_BATCH', 8))
+MIN_CONF = 0.25
+
+
+def mock_detect(image_array):
+    """Random stand-in used when no trained weights are available."""
+    rng = np.random.RandomState(int(image_array.mean()) % 100)
+    has_defect = rng.random_sample() > 0.25
+    if not has_defect:
+        return []
+    num_defects = rng.randint(1, 3)
+    detections = []
+    h, w = image_array.shape[:2]
+    for _ in range(num_defects):
+        defect = rng.choice(DEFECT_CLASSES)
+        x1 = rng.randint(0, w // 2)
+        y1 = rng.randint(0, h // 2)
+        x2 = x1 + rng.randint(40, w // 3)
+        y2 = y1 + rng.randint(40, h // 3)
+        x2, y2 = min(x2, w), min(y2, h)
+        conf = rng.uniform(0.72, 0.97)
+        detections.append({'class': str(defect), 'confidence': float(conf), 'bbox': (int(x1), int(y1), int(x2), int(y2))})
+    return detections
+
+
+def letterbox(image_array, size, out=None):
+    """Resize keeping aspect ratio and pad to ``size``×``size``.
+
+    Returns the padded frame plus the scale and (left, top) padding needed
+    to map boxes back to the original image.
+    """
+    h, w = image_array.shape[:2]
+    r = min(size / h, size / w)
+    nh, nw = int(round(h * r)), int(round(w * r))
+    if out is None:
+        out = np.empty((size, size, 3), np.uint8)
+    out[:] = 114
+    top, left = (size - nh) // 2, (size - nw) // 2
+    resized = image_array if (nh, nw) == (h, w) else cv2.resize(image_array, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    out[top:top + nh, left:left + nw] = resized
+    return out, r, (left, top)
+
+
+def split_detections(xyxy, confs, classes, counts, names, conf=0.0):
+    """Threshold boxes from a whole batch at once and split them per image."""
+    img_idx = np.repeat(np.arange(len(counts)), counts)
+    keep = confs >= conf
+    xyxy, confs, classes = xyxy[keep].round().astype(int), confs[keep], classes[keep]
+    bounds = np.cumsum(np.bincount(img_idx[keep], minlength=len(counts)))[:-1]
+    return [
+        [{'class': names[c], 'confidence': float(p), 'bbox': tuple(int(v) for v in box)}
+         for box, p, c in zip(b, ps, cs)]
+        for b, ps, cs in zip(np.split(xyxy, bounds), np.split(confs, bounds), np.split(classes, bounds))
+    ]
+
+
+class Detector:
+    """Loads the detection model once and keeps it warm for the life of the process.
+
+    Inference runs on the backend chosen by ``STEELSENSE_BACKEND`` (see
+    ``backends.py``); letterboxing and mapping boxes back to the source
+    frame happen here, so every backend returns the same detections.
+    Falls back to ``mock_detect`` when the default ``best.pt`` is missing
+    so the app still runs on machines without a trained model; a model
+    path or backend that was asked for explicitly must exist.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, imgsz=IMG_SIZE, threads=CPU_THREADS, backend=BACKEND):
+        self.model_path = model_path
+        self.imgsz = imgsz
+        self.backend = None
+        self.names = dict(enumerate(DEFECT_CLASSES))
+        self.version = 'mock'
+        self._lock = threading.Lock()
+        if os.path.exists(model_path):
+            self.backend = load_backend(model_path, imgsz, threads, self.names, backend)
+            self.names = self.backend.names
+            self.version = f"{os.path.basename(model_path)}@{int(os.path.getmtime(model_path))}:{self.backend.name}"
+        elif os.path.abspath(model_path) != DEFAULT_MODEL_PATH or backend != 'auto':
+            raise FileNotFoundError(f"Model not found: {model_path}")
+        self.warmup()
+
+    def warmup(self):
+        if self.backend is None:
+            return
+        dummy = np.zeros((1, self.imgsz, self.imgsz, 3), np.uint8)
+        self.backend.predict(dummy, MIN_CONF)
+
+    def detect(self, image_array, conf=MIN_CONF):
+        return self.detect_batch([image_array], conf=conf)[0]
+
+    def detect_batch(self, images, batch_size=BATCH_SIZE, conf=MIN_CONF):
+        """Detect defects in many frames, ``batch_size`` per forward pass."""
+        if not len(images):
+            return []
+        if self.backend is None:
+            raw = [mock_detect(img) for img in images]
+            counts = [len(r) for r in raw]
+            flat = [d for r in raw for d in r]
+            xyxy = np.array([d['bbox'] for d in flat], np.float32).reshape(-1, 4)
+            confs = np.array([d['confidence'] for d in flat], np.float32)
+            classes = np.array([DEFECT_CLASSES.index(d['class']) for d in flat], int)
+            return split_detections(xyxy, confs, classes, counts, self.names, conf)
+        results = []
+        buf = np.empty((min(batch_size, len(images)), self.imgsz, self.imgsz, 3), np.uint8)
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            n = len(chunk)
+            scales = np.empty(n, np.float32)
+            pads = np.empty((n, 2), np.float32)
+            for i, img in enumerate(chunk):
+                _, scales[i], pads[i] = letterbox(img, self.imgsz, out=buf[i])
+            with self._lock:
+                preds = self.backend.predict(buf[:n], min(conf, MIN_CONF))
+            counts = [len(p[0]) for p in preds]
+            xyxy = np.concatenate([p[0] for p in preds]).reshape(-1, 4)
+            confs = np.concatenate([p[1] for p in preds])
+            classes = np.concatenate([p[2] for p in preds]).astype(int)
+            # Undo the letterbox for every box in the batch at once, then clip per image
+            img_idx = np.repeat(np.arange(n), counts)
+            xyxy = (xyxy - np.tile(pads[img_idx], 2)) / scales[img_idx, None]
+            limits = np.array([img.shape[1::-1] * 2 for img in chunk], np.float32).reshape(n, 4)
+            xyxy = np.clip(xyxy, 0, limits[img_idx])
+            results.extend(split_detections(xyxy, confs, classes, counts, self.names, conf))
+        return results
@@ -0,0 +1,163 @@
+import os
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+from aggregates import Aggregates
+from detector import ACTIONS, DEFECT_CLASSES
+from lazy import lazy_import
+
+pd = lazy_import('pandas')
+# Parquet spill files when pyarrow is installed, .npz otherwise
+pa = lazy_import('pyarrow', optional=True)
+pq = lazy_import('pyarrow.parquet', optional=True)
+
+SEVERITIES = ['LOW', 'MEDIUM', 'CRITICAL']
+MACHINE_CODES = ['A', 'B', 'C', 'D', 'E']
+SPILL_DIR = os.environ.get('STEELSENSE_SPILL_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spill'))
+# Total bytes kept in SPILL_DIR across sessions; the oldest files go first
+SPILL_LIMIT = int(os.environ.get('STEELSENSE_SPILL_LIMIT', 1 << 30))
+
+COLUMNS = {
+    'defect': np.uint8,
+    'severity': np.uint8,
+    'machine': np.uint8,
+    'confidence': np.float32,
+    'ts': np.int64,
+}
+
+
+def now_ns():
+    """Local wall-clock time as int64 nanoseconds, matching how the log is displayed."""
+    return int(np.datetime64(datetime.now(), 'ns').astype(np.int64))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class DetectionLog:
+    """Append-only columnar store for detections.
+
+    Rows are written into fixed-size chunks of categorical codes, float32
+    confidences and int64 timestamps. Once more than ``capacity`` rows are
+    held, the oldest sealed chunks are spilled to ``spill_dir`` (Parquet
+    when pyarrow is available, otherwise ``.npz``) and dropped from memory.
+    The spill directory is capped at ``spill_limit`` bytes, shared by every
+    log writing to it, and ``discard`` deletes this log's own files.
+    ``stats`` holds the dashboard aggregates for the whole history,
+    spilled rows included.
+    """
+
+    def __init__(self, capacity=500_000, chunk_size=4096, spill_dir=SPILL_DIR, spill_limit=SPILL_LIMIT):
+        self.capacity = capacity
+        self.chunk_size = chunk_size
+        self.spill_dir = spill_dir
+        self.spill_limit = spill_limit
+        self.spill_files = []
+        self.total = 0
+        self.spilled = 0
+        self.stats = Aggregates(DEFECT_CLASSES, SEVERITIES, MACHINE_CODES)
+        self._chunks = deque()
+        self._held = 0
+        self._cur = self._new_chunk()
+        self._n = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Rows currently held in memory."""
+        return self._held + self._n
+
+    def _new_chunk(self):
+        return {name: np.empty(self.chunk_size, dtype) for name, dtype in COLUMNS.items()}
+
+    def append(self, defect_type, severity, machine, confidence, ts=None):
+        codes = (DEFECT_CLASSES.index(defect_type), SEVERITIES.index(severity), MACHINE_CODES.index(machine))
+        with self._lock:
+            i = self._n
+            cur = self._cur
+            cur['defect'][i], cur['severity'][i], cur['machine'][i] = codes
+            cur['confidence'][i] = confidence
+            ts = now_ns() if ts is None else ts
+            cur['ts'][i] = ts
+            self._n += 1
+            self.total += 1
+            self.stats.update(*codes, float(confidence), ts)
+            if self._n == self.chunk_size:
+                self._chunks.append(self._cur)
+                self._held += self.chunk_size
+                self._cur = self._new_chunk()
+                self._n = 0
+                while self._held + self._n > self.capacity and self._chunks:
+                    self._spill(self._chunks.popleft())
+
+    def _spill(self, chunk):
+        n = len(chunk['ts'])
+        self._held -= n
+        self.spilled += n
+        if not self.spill_dir:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        stem = os.path.join(self.spill_dir, f"detections_{chunk['ts'][0]}_{n}")
+        if pq is not None:
+            path = stem + '.parquet'
+            pq.write_table(pa.table(chunk), path)
+        else:
+            path = stem + '.npz'
+            np.savez(path, **chunk)
+        self.spill_files.append(path)
+        self._prune_spill()
+
+    def _prune_spill(self):
+        files = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.startswith('detections_') and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        excess = sum(size for _, size, _ in files) - self.spill_limit
+        for _, size, path in sorted(files):
+            if excess <= 0:
+                break
+            _remove(path)
+            excess -= size
+
+    def discard(self):
+        """Delete the files this log spilled; its rows are gone for good."""
+        with self._lock:
+            for path in self.spill_files:
+                _remove(path)
+            self.spill_files = []
+
+    def columns(self, last=None):
+        """Concatenated in-memory columns, optionally only the newest ``last`` rows."""
+        with self._lock:
+            parts = [{k: v[:self._n] for k, v in self._cur.items()}]
+            have = self._n
+            for chunk in reversed(self._chunks):
+                if last is not None and have >= last:
+                    break
+                parts.append(chunk)
+                have += len(chunk['ts'])
+            cols = {k: np.concatenate([p[k] for p in reversed(parts)]) for k in COLUMNS}
+        if last is not None:
+            cols = {k: v[-last:] if last else v[:0] for k, v in cols.items()}
+        return cols
+
+    def frame(self, last=None):
+        """Decoded DataFrame in the same shape the dashboard has always used."""
+        cols = self.columns(last)
+        ts = pd.to_datetime(cols['ts'])
+        defect = pd.Categorical.from_codes(cols['defect'], DEFECT_CLASSES)
+        return pd.DataFrame({
+            'date': ts.strftime('%Y-%m-%d'),
+            'timestamp': ts.strftime('%H:%M:%S'),
+            'machine': pd.Categorical.from_codes(cols['machine'], MACHINE_CODES),
+            'defect_type': defect,
+            'severity': pd.Categorical.from_codes(cols['severity'], SEVERITIES),
+            'confidence': cols['confidence'].astype(float).round(4),
+            'action': defect.map({c: a[2] for c, a in ACTIONS.items()}),
+        })
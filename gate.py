@@ -0,0 +1,97 @@
+import numpy as np
+from lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+
+# Side of the grey thumbnail used for frame differencing, and the default
+# "unchanged" thresholds: Hamming bits for dHash, mean absolute grey-level
+# difference (0-255, exposure removed) for diff. Two different plain steel
+# sheets differ by about 2-3 grey levels on the thumbnail, a re-captured
+# sheet by under 1.5.
+GATE_SIDE = 32
+GATE_THRESHOLDS = {'dhash': 10, 'diff': 1.5}
+
+
+def _thumb(image_array, w, h, stride=True):
+    """Small greyscale copy.
+
+    With ``stride`` the frame is subsampled first so 12 MP frames never hit
+    a full-size resize. That aliases fine surface texture, so a camera
+    jitter of a pixel changes the thumbnail as much as a different sheet
+    does; the per-pixel diff signature averages the whole frame instead.
+    """
+    if stride:
+        step = max(min(image_array.shape[0] // (h * 4), image_array.shape[1] // (w * 4)), 1)
+        image_array = image_array[::step, ::step]
+    if image_array.ndim == 3:
+        image_array = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(image_array, (w, h), interpolation=cv2.INTER_AREA)
+
+
+def dhash(image_array, size=8):
+    """Difference hash: ``size``×``size`` bits of left/right brightness gradients, packed.
+
+    A bit is set only for a rise of more than one grey level, so on a flat
+    belt or a plain sheet sensor noise does not flip bits from frame to frame.
+    """
+    gray = _thumb(image_array, size + 1, size).astype(np.int16)
+    return np.packbits(gray[:, 1:] - gray[:, :-1] > 1)
+
+
+class ChangeGate:
+    """Decides whether a frame shows a new part or the one last inspected.
+
+    Each frame is reduced to a tiny signature (``method='dhash'`` or a
+    ``'diff'`` thumbnail) and compared with the last frame that passed.
+    ``check`` returns ``'new'`` (run the detector), ``'same'`` (reuse the
+    previous result) or ``'empty'`` when a background has been set and
+    the frame matches the empty belt. An empty belt also clears the
+    reference, so two identical sheets in a row are still counted twice.
+    With ``learn_background`` the first frame checked is taken as the
+    empty belt.
+    """
+
+    def __init__(self, method='dhash', threshold=None, learn_background=False):
+        self.method = method
+        self.threshold = GATE_THRESHOLDS[method] if threshold is None else threshold
+        self.learn_background = learn_background
+        self.background = None
+        self.reference = None
+        self.passed = 0
+        self.same = 0
+        self.empty = 0
+
+    def signature(self, image_array):
+        if self.method == 'dhash':
+            return dhash(image_array)
+        thumb = _thumb(image_array, GATE_SIDE, GATE_SIDE, stride=False).astype(np.float32)
+        return thumb - thumb.mean()
+
+    def distance(self, a, b):
+        if self.method == 'dhash':
+            return int(np.unpackbits(a ^ b).sum())
+        return float(np.abs(a - b).mean())
+
+    def set_background(self, image_array):
+        """Remember what the empty belt looks like."""
+        self.background = self.signature(image_array)
+
+    def reset(self):
+        self.reference = None
+
+    def check(self, image_array):
+        sig = self.signature(image_array)
+        if self.learn_background and self.background is None:
+            self.background = sig
+            self.empty += 1
+            return 'empty'
+        if self.background is not None and self.distance(sig, self.background) <= self.threshold:
+            self.empty += 1
+            self.reference = None
+            return 'empty'
+        if self.reference is not None and self.distance(sig, self.reference) <= self.threshold:
+            self.same += 1
+            return 'same'
+        self.reference = sig
+        self.passed += 1
+        return 'new'
@@ -0,0 +1,184 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+from detector import ACTIONS
+from lazy import lazy_import
+
+# OpenCV and Pillow load on the first frame processed, not on every cold start
+cv2 = lazy_import('cv2')
+Image = lazy_import('PIL.Image')
+
+# Context kept around each defect box when inpainting, and the largest crop
+# side inpainted at full resolution
+REPAIR_PAD = 16
+REPAIR_MAX_SIDE = 512
+# Longest side of frames sent to the browser
+PREVIEW_SIDE = 1280
+
+SEVERITY_COLORS = {'CRITICAL': (255, 60, 60), 'MEDIUM': (255, 170, 0), 'LOW': (0, 255, 136)}
+LABEL_FONT = 0  # cv2.FONT_HERSHEY_SIMPLEX, spelled out so import stays lazy
+LABEL_SCALE = 0.55
+LABEL_THICKNESS = 2
+LABEL_HEIGHT = 22
+
+_repair_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='inpaint')
+
+
+def decode_image(data, max_side=None):
+    """Decode encoded image bytes straight to a read-only RGB array.
+
+    The upload buffer is wrapped without copying and the colour swap is done
+    in place. For JPEGs, ``max_side`` lets libjpeg decode at 1/2, 1/4 or 1/8
+    scale when the full resolution is not needed.
+    """
+    buf = np.frombuffer(data, np.uint8)
+    flag = cv2.IMREAD_COLOR
+    if max_side and bytes(buf[:2]) == b'\xff\xd8':
+        with Image.open(io.BytesIO(data)) as im:
+            longest = max(im.size)
+        for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if longest // factor >= max_side:
+                flag = reduced
+                break
+    img = cv2.imdecode(buf, flag)
+    if img is None:
+        raise ValueError("Unsupported or corrupt image")
+    cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+    img.flags.writeable = False
+    return img
+
+
+def make_preview(image_array, max_side=PREVIEW_SIDE):
+    """Display-sized version of a frame; returns the frame itself when it is already small."""
+    h, w = image_array.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return image_array
+    return cv2.resize(image_array, (max(int(w * scale), 1), max(int(h * scale), 1)), interpolation=cv2.INTER_AREA)
+
+
+def worst_severity(detections):
+    return max((ACTIONS[d['class']][0] for d in detections),
+               key=['LOW', 'MEDIUM', 'CRITICAL'].index)
+
+
+@lru_cache(maxsize=None)
+def _text_sprite(text, color):
+    """Label text pre-rasterized once on a ``color`` background."""
+    (w, _), _ = cv2.getTextSize(text, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)
+    sprite = np.empty((LABEL_HEIGHT, w + 6, 3), np.uint8)
+    sprite[:] = color
+    cv2.putText(sprite, text, (3, LABEL_HEIGHT - 6), LABEL_FONT, LABEL_SCALE, (0, 0, 0), LABEL_THICKNESS)
+    sprite.flags.writeable = False
+    return sprite
+
+
+def _label_sprite(cls, confidence, color):
+    # Class names and percentages are cached separately: 6 + 101 sprites cover every label
+    return np.hstack([_text_sprite(cls, color), _text_sprite(f"{confidence:.0%}", color)])
+
+
+def _blit(img, sprite, x, y):
+    h, w = img.shape[:2]
+    sh, sw = sprite.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sw, w), min(y + sh, h)
+    if x1 > x0 and y1 > y0:
+        img[y0:y1, x0:x1] = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+
+
+def draw_detections(image_array, detections, mode='box', max_side=None, alpha=0.35, preview=None):
+    """Draw detection boxes and labels onto a copy of ``image_array``.
+
+    Boxes are grouped by severity and drawn with one ``cv2.polylines`` call
+    per colour; labels are blitted from cached sprites. ``mode='mask'``
+    also fills each box with a semi-transparent tint. With ``max_side``
+    the overlay is rendered straight into a display-sized copy (see
+    ``make_preview``) instead of a full-resolution one; pass an existing
+    ``preview`` of the frame to skip the resize.
+    """
+    if preview is not None:
+        img = preview
+    else:
+        img = make_preview(image_array, max_side) if max_side else image_array
+    img = img.copy() if img is image_array or img is preview or not img.flags.writeable else img
+    if not detections:
+        return img
+    scale = img.shape[1] / image_array.shape[1]
+    boxes = np.round(np.array([d['bbox'] for d in detections], np.float64) * scale).astype(np.int32)
+    severities = [ACTIONS[d['class']][0] for d in detections]
+    corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+    for severity, color in SEVERITY_COLORS.items():
+        polys = [corners[i] for i, s in enumerate(severities) if s == severity]
+        if not polys:
+            continue
+        if mode == 'mask':
+            overlay = img.copy()
+            cv2.fillPoly(overlay, polys, color)
+            cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, dst=img)
+        cv2.polylines(img, polys, True, color, 2)
+    for d, (x1, y1, _, _), severity in zip(detections, boxes, severities):
+        sprite = _label_sprite(d['class'], d['confidence'], SEVERITY_COLORS[severity])
+        # Sit on top of the box, or just inside it when that would leave the frame
+        _blit(img, sprite, x1, y1 - LABEL_HEIGHT if y1 >= LABEL_HEIGHT else y1)
+    return img
+
+
+def _repair_regions(boxes, pad, shape):
+    """Pad each box by ``pad`` and merge any padded regions that touch."""
+    h, w = shape[:2]
+    regions = []
+    for x1, y1, x2, y2 in boxes:
+        r = [max(x1 - pad, 0), max(y1 - pad, 0), min(x2 + pad, w), min(y2 + pad, h), [(x1, y1, x2, y2)]]
+        merged = True
+        while merged:
+            merged = False
+            for other in regions:
+                if r[0] < other[2] and other[0] < r[2] and r[1] < other[3] and other[1] < r[3]:
+                    regions.remove(other)
+                    r = [min(r[0], other[0]), min(r[1], other[1]), max(r[2], other[2]), max(r[3], other[3]), r[4] + other[4]]
+                    merged = True
+                    break
+        regions.append(r)
+    return regions
+
+
+def _inpaint_region(image_array, region, radius, max_side):
+    x1, y1, x2, y2, boxes = region
+    crop = image_array[y1:y2, x1:x2]
+    mask = np.zeros(crop.shape[:2], np.uint8)
+    for bx1, by1, bx2, by2 in boxes:
+        mask[max(by1 - y1, 0):by2 - y1, max(bx1 - x1, 0):bx2 - x1] = 255
+    if not max_side or max(crop.shape[:2]) <= max_side:
+        return cv2.inpaint(crop, mask, radius, cv2.INPAINT_TELEA)
+    # Large regions: inpaint a pyramid-downscaled copy, upsample, keep original pixels outside the mask
+    small, small_mask = crop, mask
+    while max(small.shape[:2]) > max_side:
+        small, small_mask = cv2.pyrDown(small), cv2.pyrDown(small_mask)
+    filled = cv2.inpaint(small, (small_mask > 0).astype(np.uint8) * 255, radius, cv2.INPAINT_TELEA)
+    filled = cv2.resize(filled, (crop.shape[1], crop.shape[0]), interpolation=cv2.INTER_LINEAR)
+    out = crop.copy()
+    np.copyto(out, filled, where=mask[..., None] > 0)
+    return out
+
+
+def simulate_repair(image_array, detections, radius=5, pad=REPAIR_PAD, max_side=REPAIR_MAX_SIDE):
+    """Inpaint each defect box within a padded crop instead of the whole frame.
+
+    Overlapping crops are merged first so regions can be processed in
+    parallel and pasted back without seams. Crops longer than ``max_side``
+    are inpainted on a downscaled pyramid level; pass ``max_side=None``
+    for full resolution everywhere.
+    """
+    img = image_array.copy()
+    regions = _repair_regions([d['bbox'] for d in detections], pad, img.shape)
+    if len(regions) > 1:
+        patches = _repair_pool.map(lambda r: _inpaint_region(image_array, r, radius, max_side), regions)
+    else:
+        patches = [_inpaint_region(image_array, r, radius, max_side) for r in regions]
+    for (x1, y1, x2, y2, _), patch in zip(regions, patches):
+        img[y1:y2, x1:x2] = patch
+    return img
@@ -0,0 +1,109 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+# Import cost per module for the startup report, in the order they were loaded
+IMPORT_TIMES = {}
+_deferred = {}
+_lock = threading.RLock()
+
+
+def record_time(name, ms, how='eager', pulled_in=()):
+    """Add a row to the startup report; only the first measurement per name is kept."""
+    IMPORT_TIMES.setdefault(name, {'module': name, 'ms': round(ms, 1), 'how': how,
+                                   'pulled_in': ', '.join(sorted(pulled_in))})
+
+
+def _top_level_modules():
+    return {m.partition('.')[0] for m in sys.modules}
+
+
+def _third_party(names):
+    # Standard-library and private helper modules would only bury the packages worth knowing about
+    return {n for n in names if n not in sys.stdlib_module_names and not n.startswith('_')}
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access.
+
+    The real import (falling back to ``fallback`` if given) is timed and
+    recorded in ``IMPORT_TIMES``.
+    """
+
+    def __init__(self, name, fallback=None):
+        super().__init__(name)
+        self.__dict__['_lazy_spec'] = (name, fallback)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+        name, fallback = self.__dict__['_lazy_spec']
+        with _lock:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                before = _top_level_modules()
+                start = time.perf_counter()
+                try:
+                    module = importlib.import_module(name)
+                except ImportError:
+                    if fallback is None:
+                        raise
+                    module = importlib.import_module(fallback)
+                pulled_in = _third_party(_top_level_modules() - before - {name.partition('.')[0]})
+                record_time(name, (time.perf_counter() - start) * 1000, 'lazy', pulled_in)
+                self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name, fallback=None, optional=False):
+    """Module proxy for ``name`` that defers the import until it is first used.
+
+    With ``optional=True`` returns None when the package is not installed;
+    the check does not import anything.
+    """
+    if optional and importlib.util.find_spec(name.partition('.')[0]) is None:
+        return None
+    if name in sys.modules:
+        return sys.modules[name]
+    with _lock:
+        if name not in _deferred:
+            _deferred[name] = LazyModule(name, fallback)
+        return _deferred[name]
+
+
+@contextmanager
+def timed_import(label):
+    """Record the time spent importing inside the block, with the packages it loaded."""
+    before = _top_level_modules()
+    start = time.perf_counter()
+    yield
+    record_time(label, (time.perf_counter() - start) * 1000, 'eager',
+                _third_party(_top_level_modules() - before - {label.partition('.')[0]}))
+
+
+def timed_imports(*names):
+    """Import ``names`` in order, each timed as its own row of the startup report."""
+    for name in names:
+        with timed_import(name):
+            importlib.import_module(name)
+
+
+def import_report():
+    """Rows for every recorded import, slowest first; lazy modules not used yet are listed last."""
+    with _lock:
+        rows = sorted(IMPORT_TIMES.values(), key=lambda r: -r['ms'])
+        rows += [{'module': name, 'ms': None, 'how': 'lazy (not loaded yet)', 'pulled_in': ''}
+                 for name in _deferred if name not in IMPORT_TIMES]
+    return rows
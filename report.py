@@ -0,0 +1,198 @@
+import io
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+from lazy import lazy_import
+from detector import ACTIONS
+from imaging import make_preview, worst_severity
+
+# fpdf takes longer to import than the rest of the app; only load it for the first report
+fpdf = lazy_import('fpdf', fallback='fpdf2')
+Image = lazy_import('PIL.Image')
+
+THUMB_SIDE = 800
+BULK_THUMB_SIDE = 360
+JPEG_QUALITY = 80
+SEVERITY_RGB = {'CRITICAL': (220, 50, 50), 'MEDIUM': (220, 150, 0), 'LOW': (0, 200, 100)}
+DISPOSITION_RGB = {'REJECT': (220, 50, 50), 'REWORK': (220, 150, 0), 'ACCEPT': (0, 200, 100)}
+SEVERITY_RANK = {'CRITICAL': 0, 'MEDIUM': 1, 'LOW': 2}
+# Defects listed per part in a shift report; three plus a "+k more" line fit the half-page slot
+SHIFT_MAX_DEFECTS = 3
+
+# Reports render one at a time off the UI thread
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report')
+
+
+def disposition(detections):
+    if not detections:
+        return 'ACCEPT'
+    severity = worst_severity(detections)
+    return 'REJECT' if severity == 'CRITICAL' else 'REWORK' if severity == 'MEDIUM' else 'ACCEPT'
+
+
+def jpeg_thumbnail(image, max_side=THUMB_SIDE, quality=JPEG_QUALITY):
+    """Downscaled JPEG of a PIL image or RGB array, as an in-memory buffer."""
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(make_preview(image, max_side))
+    else:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.BILINEAR)
+    buf = io.BytesIO()
+    image.convert('RGB').save(buf, format='JPEG', quality=quality, optimize=True)
+    buf.seek(0)
+    return buf
+
+
+def _latin1(text):
+    # Core PDF fonts only cover latin-1; file names from zips may not
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+def _output(pdf):
+    result = pdf.output()
+    if isinstance(result, str):
+        return result.encode('latin-1')
+    return bytes(result) if isinstance(result, bytearray) else result
+
+
+def _header(pdf, title, subtitle_lines):
+    pdf.set_font('Arial', 'B', 20)
+    pdf.set_text_color(0, 180, 220)
+    pdf.cell(0, 12, title, ln=True, align='C')
+    pdf.set_font('Arial', '', 9)
+    pdf.set_text_color(100, 140, 180)
+    for line in subtitle_lines:
+        pdf.cell(0, 6, _latin1(line), ln=True, align='C')
+    pdf.ln(5)
+
+
+def _inspection_block(pdf, image_buf, detections, top, image_w=90, disposition_y=None, max_defects=None):
+    """Image on the left, defect list on the right, disposition underneath.
+
+    With ``max_defects`` only the most severe, most confident detections
+    are listed and the rest are summarised on one "+k more" line.
+    """
+    if image_buf is not None:
+        pdf.image(image_buf, x=10, y=top, w=image_w)
+    pdf.set_y(top)
+    pdf.set_x(110)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.set_text_color(0, 212, 255)
+    pdf.cell(0, 8, 'DEFECTS DETECTED', ln=True)
+    listed, rest = detections, []
+    if max_defects is not None and len(detections) > max_defects:
+        ranked = sorted(detections, key=lambda d: (SEVERITY_RANK[ACTIONS[d['class']][0]], -d['confidence']))
+        listed, rest = ranked[:max_defects], ranked[max_defects:]
+    for d in listed:
+        severity, icon, action = ACTIONS[d['class']]
+        pdf.set_x(110)
+        pdf.set_font('Arial', 'B', 10)
+        pdf.set_text_color(*SEVERITY_RGB[severity])
+        pdf.cell(0, 6, f'{d["class"].upper()} - {severity}', ln=True)
+        pdf.set_x(110)
+        pdf.set_font('Arial', '', 9)
+        pdf.set_text_color(60, 100, 140)
+        pdf.cell(0, 5, f'Confidence: {d["confidence"]:.1%}', ln=True)
+        pdf.set_x(110)
+        pdf.set_text_color(80, 120, 160)
+        pdf.multi_cell(80, 5, f'Action: {action}')
+        pdf.ln(2)
+    if rest:
+        pdf.set_x(110)
+        pdf.set_font('Arial', 'I', 9)
+        pdf.set_text_color(100, 140, 180)
+        counts = Counter(d['class'] for d in rest)
+        pdf.multi_cell(80, 5, f'+{len(rest)} more: ' + ', '.join(f'{k} x{v}' for k, v in counts.most_common()))
+        pdf.ln(2)
+    if disposition_y is not None:
+        pdf.set_y(disposition_y)
+    else:
+        pdf.set_x(110)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.set_text_color(0, 212, 255)
+    pdf.cell(0, 8, 'DISPOSITION', ln=True)
+    verdict = disposition(detections)
+    if disposition_y is None:
+        pdf.set_x(110)
+    pdf.set_font('Arial', 'B', 18)
+    pdf.set_text_color(*DISPOSITION_RGB[verdict])
+    pdf.cell(0, 12, verdict, ln=True)
+
+
+def generate_pdf(image, detections, timestamp, machine_code='A'):
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    pdf.set_fill_color(10, 14, 26)
+    _header(pdf, 'STEELSENSE AI - INSPECTION REPORT', [
+        f'Generated: {timestamp}',
+        f'Machine Code: {machine_code}    |    Date: {datetime.now().strftime("%Y-%m-%d")}',
+    ])
+    _inspection_block(pdf, jpeg_thumbnail(image), detections, top=35, disposition_y=140)
+    return _output(pdf)
+
+
+def generate_shift_report(items, machine_code='A', max_images=300):
+    """One consolidated PDF for a whole batch or shift.
+
+    ``items`` are dicts with ``name``, ``detections`` and optionally
+    ``thumb`` (JPEG bytes, see ``jpeg_thumbnail``). The first page holds
+    totals and a per-part table; parts with defects follow, two per page,
+    up to ``max_images`` of them, each listing at most ``SHIFT_MAX_DEFECTS``
+    defects so it stays within its half page.
+    """
+    started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    verdicts = [disposition(it['detections']) for it in items]
+    by_verdict = Counter(verdicts)
+    by_defect = Counter(d['class'] for it in items for d in it['detections'])
+
+    pdf = fpdf.FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    _header(pdf, 'STEELSENSE AI - SHIFT REPORT', [
+        f'Generated: {started}',
+        f'Machine Code: {machine_code}    |    Parts: {len(items)}',
+    ])
+    pdf.set_font('Arial', 'B', 11)
+    pdf.set_text_color(0, 212, 255)
+    pdf.cell(0, 8, 'SUMMARY', ln=True)
+    pdf.set_font('Arial', '', 10)
+    for verdict in ['ACCEPT', 'REWORK', 'REJECT']:
+        pdf.set_text_color(*DISPOSITION_RGB[verdict])
+        pdf.cell(45, 6, f'{verdict}: {by_verdict.get(verdict, 0)}')
+    pdf.ln(8)
+    pdf.set_text_color(60, 100, 140)
+    pdf.multi_cell(0, 5, 'Defects: ' + (', '.join(f'{k} x{v}' for k, v in by_defect.most_common()) or 'none'))
+    pdf.ln(3)
+
+    pdf.set_font('Arial', 'B', 9)
+    pdf.set_text_color(0, 212, 255)
+    for label, w in [('#', 12), ('PART', 78), ('DEFECTS', 70), ('RESULT', 25)]:
+        pdf.cell(w, 6, label)
+    pdf.ln(6)
+    pdf.set_font('Arial', '', 8)
+    for i, (it, verdict) in enumerate(zip(items, verdicts), 1):
+        pdf.set_text_color(80, 120, 160)
+        pdf.cell(12, 5, str(i))
+        pdf.cell(78, 5, _latin1(it['name'])[-48:])
+        pdf.cell(70, 5, ', '.join(d['class'] for d in it['detections'])[:45])
+        pdf.set_text_color(*DISPOSITION_RGB[verdict])
+        pdf.cell(25, 5, verdict, ln=True)
+
+    flagged = [it for it in items if it['detections'] and it.get('thumb') is not None][:max_images]
+    for i, it in enumerate(flagged):
+        top = 20 if i % 2 == 0 else 150
+        if i % 2 == 0:
+            pdf.add_page()
+        pdf.set_y(top - 8)
+        pdf.set_font('Arial', 'B', 9)
+        pdf.set_text_color(100, 140, 180)
+        pdf.cell(0, 6, _latin1(it['name']), ln=True)
+        _inspection_block(pdf, io.BytesIO(it['thumb']), it['detections'], top=top, image_w=85,
+                          max_defects=SHIFT_MAX_DEFECTS)
+    return _output(pdf)
+
+
+def submit_shift_report(items, machine_code='A'):
+    """Render ``generate_shift_report`` on the background report thread; returns a Future."""
+    return _executor.submit(generate_shift_report, list(items), machine_code)
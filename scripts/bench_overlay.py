@@ -0,0 +1,78 @@
+"""Micro-benchmark for draw_detections: ms per frame against box count.
+
+Compares the old per-detection rectangle/putText loop (alone, and followed
+by the preview resize the app used to do) with the batched renderer at full
+resolution, onto a cached display preview, and in mask mode.
+
+    python scripts/bench_overlay.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from detector import ACTIONS, DEFECT_CLASSES  # noqa: E402
+from imaging import SEVERITY_COLORS, draw_detections, make_preview  # noqa: E402
+
+FRAMES = [(1080, 1920), (3000, 4000)]
+BOX_COUNTS = [1, 5, 10, 25, 50, 100, 200]
+
+
+def legacy_draw(image_array, detections):
+    img = image_array.copy()
+    for d in detections:
+        color = SEVERITY_COLORS[ACTIONS[d['class']][0]]
+        x1, y1, x2, y2 = d['bbox']
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, 2)
+        label = f"{d['class']} {d['confidence']:.0%}"
+        cv2.rectangle(img, (x1, y1 - 22), (x1 + len(label) * 9, y1), color, -1)
+        cv2.putText(img, label, (x1 + 3, y1 - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 2)
+    return img
+
+
+def random_detections(n, h, w, rng):
+    dets = []
+    for _ in range(n):
+        bw, bh = rng.randint(w // 20, w // 5), rng.randint(h // 20, h // 5)
+        x1, y1 = rng.randint(0, w - bw), rng.randint(0, h - bh)
+        dets.append({'class': DEFECT_CLASSES[rng.randint(len(DEFECT_CLASSES))],
+                     'confidence': round(float(rng.uniform(0.5, 1.0)), 3),
+                     'bbox': [x1, y1, x1 + bw, y1 + bh]})
+    return dets
+
+
+def bench(fn, repeat):
+    fn()  # warm sprite caches
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.RandomState(0)
+    print(f"{'frame':>10} {'boxes':>6} {'legacy':>9} {'+preview':>9} {'full':>9} {'display':>9} {'mask':>9}   (ms/frame)")
+    for h, w in FRAMES:
+        img = rng.randint(0, 255, (h, w, 3), np.uint8)
+        img.flags.writeable = False
+        preview = make_preview(img)
+        for n in BOX_COUNTS:
+            dets = random_detections(n, h, w, rng)
+            row = [
+                bench(lambda: legacy_draw(img, dets), args.repeat),
+                bench(lambda: make_preview(legacy_draw(img, dets)), args.repeat),
+                bench(lambda: draw_detections(img, dets), args.repeat),
+                bench(lambda: draw_detections(img, dets, preview=preview), args.repeat),
+                bench(lambda: draw_detections(img, dets, 'mask', preview=preview), args.repeat),
+            ]
+            print(f"{w}x{h:<5} {n:>6} " + ' '.join(f'{v:9.2f}' for v in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""Headless end-to-end benchmark of the inspection pipeline.
+
+Drives decode -> detect -> draw -> inpaint -> pdf over synthetic steel
+surfaces at several resolutions and defect counts, and prints per-stage
+latency percentiles, throughput and peak RSS as JSON.
+
+    python scripts/bench_pipeline.py                                 # compare with the stored baseline
+    python scripts/bench_pipeline.py --save-baseline                 # record this machine's baseline
+    python scripts/bench_pipeline.py --quick --out run.json
+
+Exits with status 1 when any stage's p50 is slower than the baseline by
+more than ``--tolerance`` (default 25%), so it can gate a deploy.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from detector import DEFECT_CLASSES, Detector  # noqa: E402
+from imaging import decode_image, draw_detections, make_preview, simulate_repair  # noqa: E402
+from report import generate_pdf  # noqa: E402
+from timing import STAGES, StageTimer  # noqa: E402
+
+BASELINE_PATH = os.path.join(ROOT, 'scripts', 'bench_baseline.json')
+RESOLUTIONS = [(640, 480), (1920, 1080), (4000, 3000)]
+DEFECT_COUNTS = [1, 5, 20]
+
+
+def steel_surface(w, h, seed):
+    """Brushed-steel texture: grey base, rolling streaks along x, fine grain."""
+    rng = np.random.RandomState(seed)
+    streaks = cv2.resize(rng.normal(0, 1, (h, max(w // 64, 1))).astype(np.float32), (w, h),
+                         interpolation=cv2.INTER_LINEAR)
+    grain = rng.normal(0, 1, (h // 2, w // 2)).astype(np.float32)
+    grain = cv2.resize(cv2.GaussianBlur(grain, (0, 0), 1.0), (w, h), interpolation=cv2.INTER_LINEAR)
+    gray = np.clip(140 + 12 * streaks + 6 * grain, 0, 255).astype(np.uint8)
+    return np.dstack([gray, gray, (gray * 0.97).astype(np.uint8)])
+
+
+def add_defects(img, n, seed):
+    """Paint ``n`` dark pits/scratches and return matching detection dicts."""
+    rng = np.random.RandomState(seed + 1)
+    h, w = img.shape[:2]
+    detections = []
+    for i in range(n):
+        bw, bh = rng.randint(max(w // 40, 8), max(w // 8, 16)), rng.randint(max(h // 40, 8), max(h // 8, 16))
+        x1, y1 = rng.randint(0, w - bw), rng.randint(0, h - bh)
+        if i % 2:
+            cv2.line(img, (x1, y1 + bh // 2), (x1 + bw, y1 + bh // 2 + rng.randint(-3, 4)), (70, 70, 68), 2)
+        else:
+            cv2.ellipse(img, (x1 + bw // 2, y1 + bh // 2), (bw // 3, bh // 3), 0, 0, 360, (60, 58, 55), -1)
+        detections.append({'class': DEFECT_CLASSES[i % len(DEFECT_CLASSES)],
+                           'confidence': float(rng.uniform(0.6, 0.98)), 'bbox': (x1, y1, x1 + bw, y1 + bh)})
+    return detections
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(detector, w, h, n_defects, repeat, seed):
+    img = steel_surface(w, h, seed)
+    detections = add_defects(img, n_defects, seed)
+    _, jpeg = cv2.imencode('.jpg', cv2.cvtColor(img, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+    data = jpeg.tobytes()
+    samples = {s: [] for s in STAGES if s != 'db'}
+    totals = []
+    for i in range(repeat + 1):
+        timer = StageTimer()
+        started = time.perf_counter()
+        with timer.stage('decode'):
+            frame = decode_image(data)
+            preview = make_preview(frame)
+        with timer.stage('detect'):
+            detector.detect(frame)
+        # Draw/repair/report use the planted defects so the count is controlled
+        with timer.stage('draw'):
+            draw_detections(frame, detections, preview=preview)
+        with timer.stage('inpaint'):
+            simulate_repair(frame, detections)
+        with timer.stage('pdf'):
+            generate_pdf(frame, detections, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        if i == 0:
+            continue  # warm-up: sprite caches, fpdf import, allocator
+        totals.append((time.perf_counter() - started) * 1000)
+        for stage, ms in timer.timings.items():
+            samples[stage].append(ms)
+    stages = {}
+    for stage, vals in samples.items():
+        p50, p95 = np.percentile(vals, [50, 95])
+        stages[stage] = {'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2), 'mean_ms': round(float(np.mean(vals)), 2)}
+    p50, p95 = np.percentile(totals, [50, 95])
+    return {
+        'case': f'{w}x{h}/{n_defects}',
+        'width': w, 'height': h, 'defects': n_defects, 'repeat': repeat,
+        'stages': stages,
+        'total': {'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2)},
+        'throughput_img_s': round(1000 / float(np.mean(totals)), 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(result, baseline, tolerance):
+    """Stage p50 ratios against the baseline; returns (rows, regressions)."""
+    base_cases = {c['case']: c for c in baseline['cases']}
+    rows, regressions = [], []
+    for case in result['cases']:
+        base = base_cases.get(case['case'])
+        if base is None:
+            continue
+        for stage, cur in list(case['stages'].items()) + [('total', case['total'])]:
+            ref = base['stages'].get(stage) if stage != 'total' else base['total']
+            if not ref or not ref['p50_ms']:
+                continue
+            ratio = cur['p50_ms'] / ref['p50_ms']
+            row = {'case': case['case'], 'stage': stage, 'baseline_ms': ref['p50_ms'],
+                   'current_ms': cur['p50_ms'], 'ratio': round(ratio, 3)}
+            rows.append(row)
+            # Sub-millisecond stages are too noisy to gate on
+            if ratio > 1 + tolerance and cur['p50_ms'] - ref['p50_ms'] > 1.0:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='timed iterations per case (plus one warm-up)')
+    parser.add_argument('--quick', action='store_true', help='smallest two resolutions, 3 iterations')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write the JSON result here as well as to stdout')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown before failing')
+    args = parser.parse_args()
+
+    resolutions = RESOLUTIONS[:2] if args.quick else RESOLUTIONS
+    repeat = 3 if args.quick else args.repeat
+    detector = Detector()
+    started = time.perf_counter()
+    cases = []
+    for w, h in resolutions:
+        for n in DEFECT_COUNTS:
+            cases.append(run_case(detector, w, h, n, repeat, args.seed))
+            print(f"{cases[-1]['case']:>14}: {cases[-1]['total']['p50_ms']:8.1f} ms p50, "
+                  f"{cases[-1]['throughput_img_s']:6.2f} img/s", file=sys.stderr)
+    result = {
+        'meta': {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'detector': detector.version,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'wall_s': round(time.perf_counter() - started, 1),
+        },
+        'cases': cases,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f'baseline saved to {args.baseline}', file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows, regressions = compare(result, baseline, args.tolerance)
+        result['baseline'] = {'path': args.baseline, 'commit': baseline['meta'].get('commit'),
+                              'tolerance': args.tolerance, 'comparison': rows, 'regressions': regressions}
+        for r in regressions:
+            print(f"REGRESSION {r['case']} {r['stage']}: {r['baseline_ms']} -> {r['current_ms']} ms "
+                  f"(x{r['ratio']})", file=sys.stderr)
+    else:
+        print(f'no baseline at {args.baseline}; run with --save-baseline to create one', file=sys.stderr)
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Accuracy and latency of several detector backends on a validation folder.
+
+    python scripts/compare_backends.py data/val best.pt best.onnx best_int8.onnx
+    python scripts/compare_backends.py data/val best.pt openvino=best_int8_openvino_model --json cmp.json
+
+Each model is ``path`` (backend picked from the extension) or
+``backend=path``. The first model is the reference: the others report
+precision/recall of their boxes against it (IoU >= 0.5, same class). When
+YOLO label files exist (``labels/<stem>.txt`` or ``<stem>.txt`` next to the
+image), every model is also scored against them.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch import collect_jobs  # noqa: E402
+from detector import BATCH_SIZE, Detector  # noqa: E402
+from imaging import decode_image  # noqa: E402
+
+
+def load_labels(folder, name, shape, names):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    for path in (os.path.join(folder, 'labels', stem + '.txt'), os.path.join(folder, stem + '.txt')):
+        if os.path.exists(path):
+            break
+    else:
+        return None
+    h, w = shape[:2]
+    rows = np.loadtxt(path, ndmin=2)
+    out = []
+    for cls, cx, cy, bw, bh in rows[:, :5]:
+        out.append({'class': names[int(cls)],
+                    'bbox': ((cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h)})
+    return out
+
+
+def iou(a, b):
+    iw = max(min(a[2], b[2]) - max(a[0], b[0]), 0)
+    ih = max(min(a[3], b[3]) - max(a[1], b[1]), 0)
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match(preds, truth, thresh=0.5):
+    """True positives of ``preds`` against ``truth``, greedy by confidence."""
+    used = set()
+    tp = 0
+    for p in sorted(preds, key=lambda d: -d.get('confidence', 0)):
+        best, best_j = thresh, None
+        for j, t in enumerate(truth):
+            if j not in used and t['class'] == p['class']:
+                v = iou(p['bbox'], t['bbox'])
+                if v >= best:
+                    best, best_j = v, j
+        if best_j is not None:
+            used.add(best_j)
+            tp += 1
+    return tp
+
+
+def score(all_preds, all_truth):
+    tp = sum(match(p, t) for p, t in zip(all_preds, all_truth))
+    n_pred = sum(len(p) for p in all_preds)
+    n_true = sum(len(t) for t in all_truth)
+    precision = tp / n_pred if n_pred else 1.0
+    recall = tp / n_true if n_true else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4)}
+
+
+def run_model(spec, images, conf, batch_size):
+    backend, _, path = spec.rpartition('=')
+    started = time.perf_counter()
+    detector = Detector(path, backend=backend or 'auto')
+    load_s = time.perf_counter() - started
+    single = []
+    preds = []
+    for img in images:
+        t0 = time.perf_counter()
+        preds.append(detector.detect(img, conf=conf))
+        single.append((time.perf_counter() - t0) * 1000)
+    t0 = time.perf_counter()
+    detector.detect_batch(images, batch_size, conf=conf)
+    batch_ips = len(images) / (time.perf_counter() - t0)
+    p50, p95 = np.percentile(single, [50, 95])
+    row = {'model': spec, 'version': detector.version, 'load_s': round(load_s, 2),
+           'p50_ms': round(p50, 1), 'p95_ms': round(p95, 1), 'mean_ms': round(float(np.mean(single)), 1),
+           'batch_img_s': round(batch_ips, 1), 'detections': sum(len(p) for p in preds)}
+    return row, preds, detector.names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('folder', help='validation images (optionally with YOLO labels)')
+    parser.add_argument('models', nargs='+', help='path or backend=path; the first is the reference')
+    parser.add_argument('--conf', type=float, default=0.25)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--limit', type=int, default=500, help='at most this many images')
+    parser.add_argument('--json', help='also write the results here')
+    args = parser.parse_args()
+    for spec in args.models:
+        if not os.path.exists(spec.rpartition('=')[2]):
+            parser.error(f'model not found: {spec}')
+
+    names, images = [], []
+    for name, loader in collect_jobs(folder=args.folder)[:args.limit]:
+        try:
+            images.append(decode_image(loader()))
+            names.append(name)
+        except ValueError:
+            print(f'skipping unreadable {name}')
+    if not images:
+        parser.error(f'no images found in {args.folder}')
+
+    rows, reference, truth = [], None, None
+    for spec in args.models:
+        row, preds, class_names = run_model(spec, images, args.conf, args.batch_size)
+        if truth is None:
+            labels = [load_labels(args.folder, n, img.shape, class_names) for n, img in zip(names, images)]
+            truth = labels if all(t is not None for t in labels) else False
+        if reference is None:
+            reference = preds
+        else:
+            row.update({f'vs_ref_{k}': v for k, v in score(preds, reference).items()})
+        if truth:
+            row.update({f'vs_labels_{k}': v for k, v in score(preds, truth).items()})
+        rows.append(row)
+        print(f"{spec}: {row['p50_ms']} ms p50, {row['batch_img_s']} img/s batched")
+
+    import pandas as pd
+    print(f'\n{len(images)} images · reference {args.models[0]}' + (' · labels found' if truth else ''))
+    print(pd.DataFrame(rows).set_index('model').T.to_string())
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'images': len(images), 'conf': args.conf, 'results': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Export best.pt for the CPU backends, optionally quantized to INT8.
+
+    python scripts/export_model.py best.pt                                # -> best.onnx
+    python scripts/export_model.py best.pt --int8 --calib data/val        # -> best_int8.onnx
+    python scripts/export_model.py best.pt --format openvino --int8 --calib data/val
+
+INT8 uses static QDQ quantization from onnxruntime, calibrated on letterboxed
+images from ``--calib``. OpenVINO models are converted from the (FP32 or
+INT8) ONNX file, so both runtimes execute the same quantized graph. An
+existing .onnx file can be passed instead of .pt to skip the export step.
+Point the app at the result with STEELSENSE_MODEL (the backend is picked
+from the extension, or set STEELSENSE_BACKEND).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backends import parse_names  # noqa: E402
+from batch import collect_jobs  # noqa: E402
+from detector import IMG_SIZE, letterbox  # noqa: E402
+from imaging import decode_image  # noqa: E402
+
+
+def export_onnx(weights, imgsz):
+    from ultralytics import YOLO
+    model = YOLO(weights)
+    path = model.export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+    return str(path), model.names
+
+
+def onnx_names(onnx_path):
+    import onnxruntime as ort
+    meta = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_modelmeta()
+    return parse_names(meta.custom_metadata_map.get('names'), None)
+
+
+def calibration_batches(folder, imgsz, limit):
+    """Letterboxed NCHW float32 batches of one image, as the backends feed them."""
+    for name, loader in collect_jobs(folder=folder)[:limit]:
+        try:
+            img = decode_image(loader())
+        except ValueError:
+            continue
+        frame, _, _ = letterbox(img, imgsz)
+        yield frame.transpose(2, 0, 1)[None].astype('float32') / 255
+
+
+def quantize_int8(onnx_path, calib, imgsz, limit):
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    import onnxruntime as ort
+
+    input_name = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = calibration_batches(calib, imgsz, limit)
+
+        def get_next(self):
+            x = next(self.batches, None)
+            return None if x is None else {input_name: x}
+
+    stem = os.path.splitext(onnx_path)[0]
+    prepped, out = stem + '_prep.onnx', stem + '_int8.onnx'
+    quant_pre_process(onnx_path, prepped, skip_symbolic_shape=True)
+    try:
+        quantize_static(prepped, out, Reader(), quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    finally:
+        os.remove(prepped)
+    names = onnx_names(onnx_path)
+    if names:
+        # Quantization drops the export metadata the backends read class names from
+        import onnx
+        model = onnx.load(out)
+        onnx.helper.set_model_props(model, {'names': str(names)})
+        onnx.save(model, out)
+    return out
+
+
+def convert_openvino(onnx_path, names):
+    import openvino as ov
+    stem = os.path.splitext(os.path.basename(onnx_path))[0]
+    out_dir = os.path.join(os.path.dirname(onnx_path), f'{stem}_openvino_model')
+    os.makedirs(out_dir, exist_ok=True)
+    xml = os.path.join(out_dir, f'{stem}.xml')
+    ov.save_model(ov.convert_model(onnx_path), xml, compress_to_fp16=False)
+    if names:
+        with open(os.path.join(out_dir, 'metadata.yaml'), 'w', encoding='utf-8') as f:
+            f.write('names:\n' + ''.join(f'  {k}: {v}\n' for k, v in names.items()))
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('weights', help='best.pt, or an already exported .onnx')
+    parser.add_argument('--format', choices=['onnx', 'openvino'], default='onnx')
+    parser.add_argument('--int8', action='store_true', help='static INT8 quantization (needs --calib)')
+    parser.add_argument('--calib', help='folder of representative images for INT8 calibration')
+    parser.add_argument('--calib-size', type=int, default=200)
+    parser.add_argument('--imgsz', type=int, default=IMG_SIZE)
+    args = parser.parse_args()
+    if args.int8 and not args.calib:
+        parser.error('--int8 needs --calib with representative images')
+
+    if args.weights.endswith('.onnx'):
+        onnx_path, names = args.weights, onnx_names(args.weights)
+    else:
+        onnx_path, names = export_onnx(args.weights, args.imgsz)
+        print(f'exported {onnx_path}')
+    if args.int8:
+        onnx_path = quantize_int8(onnx_path, args.calib, args.imgsz, args.calib_size)
+        print(f'quantized {onnx_path}')
+    out, backend = onnx_path, 'onnx'
+    if args.format == 'openvino':
+        out, backend = convert_openvino(onnx_path, names), 'openvino'
+        print(f'converted {out}')
+    print(f'\nSTEELSENSE_MODEL={out} STEELSENSE_BACKEND={backend} streamlit run app.py')
+
+
+if __name__ == '__main__':
+    main()
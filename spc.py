@@ -0,0 +1,196 @@
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+import numpy as np
+from lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+SPC_WINDOW = int(os.environ.get('STEELSENSE_SPC_WINDOW', 200))      # parts in the sliding rate
+SPC_SUBGROUP = int(os.environ.get('STEELSENSE_SPC_SUBGROUP', 100))  # parts per p-chart point
+SPC_WARMUP = int(os.environ.get('STEELSENSE_SPC_WARMUP', 300))      # parts before alerts start
+SPC_SHIFT = 2.0   # CUSUM is tuned to detect the defect rate doubling
+SPC_H = 7.0       # CUSUM decision interval, in log-likelihood units
+SPC_ALPHA = 0.00135  # p-chart false-alarm probability per subgroup, as a 3-sigma limit intends
+
+
+def binomial_ucl(p, n, alpha=SPC_ALPHA):
+    """Upper control limit c/n with P(X > c) <= alpha for X ~ Binomial(n, p), elementwise.
+
+    Exact, unlike p + 3 sigma, which fires far too often at the low
+    rates and small subgroups typical here.
+    """
+    p = np.asarray(p, np.float64)
+    pmf = (1 - p) ** n
+    cdf = pmf.copy()
+    c = np.zeros(p.shape, np.int64)
+    for k in range(1, n + 1):
+        todo = 1 - cdf > alpha
+        if not todo.any():
+            break
+        pmf = pmf * (n - k + 1) / k * p / (1 - p)
+        c[todo] = k
+        cdf[todo] += pmf[todo]
+    return c / n
+
+
+class SPCMonitor:
+    """Streaming drift detection per (machine, defect class).
+
+    Every inspected part is one Bernoulli observation per defect class
+    for its machine: 1 if the class was detected on it, 0 otherwise.
+    For each key the monitor keeps a sliding-window rate over the last
+    ``window`` parts, a p-chart over non-overlapping subgroups and a
+    Bernoulli CUSUM, all against the key's running in-control rate.
+    Alerts start after ``warmup`` parts and fire once when a key goes out
+    of control; while it is in alarm its parts are kept out of the
+    baseline. State is a few fixed-size arrays, so memory does not grow
+    with the number of parts and nothing rescans history.
+    """
+
+    def __init__(self, defect_classes, machines, window=SPC_WINDOW, subgroup=SPC_SUBGROUP,
+                 warmup=SPC_WARMUP, shift=SPC_SHIFT, h=SPC_H, alpha=SPC_ALPHA, max_alerts=100, keep_points=60):
+        self.defect_classes = list(defect_classes)
+        self.machines = list(machines)
+        self.window = window
+        self.subgroup = subgroup
+        self.warmup = warmup
+        self.shift = shift
+        self.h = h
+        self.alpha = alpha
+        shape = (len(self.machines), len(self.defect_classes))
+        self.parts = np.zeros(len(self.machines), np.int64)
+        # Sliding window: one bit per part and class, as a ring buffer per machine
+        self._ring = np.zeros(shape + (window,), np.uint8)
+        self._ring_i = np.zeros(len(self.machines), np.int64)
+        self._win_sum = np.zeros(shape, np.int64)
+        self._base_count = np.zeros(shape, np.int64)
+        self._base_n = np.zeros(shape, np.int64)
+        self.baseline = np.full(shape, np.nan)
+        self.ucl = np.full(shape, np.nan)
+        self._w1 = np.zeros(shape)
+        self._w0 = np.zeros(shape)
+        self.cusum = np.zeros(shape)
+        self._sub_count = np.zeros(shape, np.int64)
+        self._sub_n = np.zeros(len(self.machines), np.int64)
+        self.last_p = np.full(shape, np.nan)
+        self.alarm = np.zeros(shape, bool)
+        self.points = [deque(maxlen=keep_points) for _ in self.machines]
+        self.alerts = deque(maxlen=max_alerts)
+
+    def observe(self, machine, defect_types, ts=None):
+        """Fold in one inspected part; returns the alerts it raised."""
+        m = self.machines.index(machine)
+        x = np.zeros(len(self.defect_classes), np.uint8)
+        for d in defect_types:
+            x[self.defect_classes.index(d)] = 1
+        ts = time.time() if ts is None else ts
+        self.parts[m] += 1
+
+        i = self._ring_i[m]
+        self._win_sum[m] += x.astype(np.int64) - self._ring[m, :, i]
+        self._ring[m, :, i] = x
+        self._ring_i[m] = (i + 1) % self.window
+
+        if self._base_n[m].min() < self.warmup:
+            self._update_baseline(m, x, ~self.alarm[m])
+            if self._base_n[m].min() == self.warmup:
+                self.ucl[m] = binomial_ucl(self.baseline[m], self.subgroup, self.alpha)
+            return []
+
+        new = []
+        # Bernoulli CUSUM: log-likelihood ratio of "rate is shift x baseline" vs baseline
+        self.cusum[m] = np.maximum(0.0, self.cusum[m] + np.where(x, self._w1[m], self._w0[m]))
+        over = self.cusum[m] > self.h
+        for d in np.flatnonzero(over & ~self.alarm[m]):
+            new.append(self._alert(ts, m, d, 'CUSUM', self.window_rate(m, d)))
+        self.alarm[m] |= over
+        # Held at the limit while in alarm, so it drains soon after the rate recovers
+        np.minimum(self.cusum[m], self.h, out=self.cusum[m])
+
+        self._sub_count[m] += x
+        self._sub_n[m] += 1
+        if self._sub_n[m] == self.subgroup:
+            p = self._sub_count[m] / self.subgroup
+            self.ucl[m] = binomial_ucl(self.baseline[m], self.subgroup, self.alpha)
+            self.last_p[m] = p
+            self.points[m].append((ts, p))
+            out = p > self.ucl[m]
+            for d in np.flatnonzero(out & ~self.alarm[m]):
+                new.append(self._alert(ts, m, d, 'p-chart', p[d]))
+            # An alarm clears once a subgroup is back in limits and the CUSUM has settled
+            self.alarm[m] = out | (self.alarm[m] & (self.cusum[m] > self.h / 2))
+            self._sub_count[m] = 0
+            self._sub_n[m] = 0
+        # Keys out of control do not pull the baseline towards the drifted rate
+        self._update_baseline(m, x, ~self.alarm[m])
+        return new
+
+    def _update_baseline(self, m, x, keep):
+        # Running in-control rate; +0.5 keeps a class not seen yet from getting a zero baseline
+        self._base_count[m] += x * keep
+        self._base_n[m] += keep
+        p0 = (self._base_count[m] + 0.5) / (self._base_n[m] + 1)
+        p1 = np.minimum(p0 * self.shift, 0.99)
+        self.baseline[m] = p0
+        self._w1[m] = np.log(p1 / p0)
+        self._w0[m] = np.log((1 - p1) / (1 - p0))
+
+    def _alert(self, ts, m, d, kind, value):
+        alert = {'ts': ts, 'machine': self.machines[m], 'defect_type': self.defect_classes[d], 'kind': kind,
+                 'rate': float(value), 'baseline': float(self.baseline[m, d]), 'ucl': float(self.ucl[m, d])}
+        self.alerts.append(alert)
+        return alert
+
+    def window_rate(self, m, d):
+        n = min(self.parts[m], self.window)
+        return self._win_sum[m, d] / n if n else math.nan
+
+    def rebaseline(self, machine=None):
+        """Start a new warm-up for ``machine`` (all machines when None), e.g. after maintenance."""
+        for m in ([self.machines.index(machine)] if machine else range(len(self.machines))):
+            self._base_count[m] = 0
+            self._base_n[m] = 0
+            self.baseline[m] = self.ucl[m] = self.last_p[m] = np.nan
+            self.cusum[m] = 0.0
+            self._sub_count[m] = 0
+            self._sub_n[m] = 0
+            self.alarm[m] = False
+            self.points[m].clear()
+
+    @property
+    def active(self):
+        """(machine, defect_type) pairs currently out of control."""
+        return [(self.machines[m], self.defect_classes[d]) for m, d in zip(*np.nonzero(self.alarm))]
+
+    def status(self):
+        """One row per (machine, defect class) for machines that have seen parts."""
+        rows = []
+        for m, machine in enumerate(self.machines):
+            if not self.parts[m]:
+                continue
+            warming = self._base_n[m].min() < self.warmup
+            for d, defect in enumerate(self.defect_classes):
+                rows.append({
+                    'machine': machine, 'defect_type': defect, 'parts': int(self.parts[m]),
+                    'window_rate': round(float(self.window_rate(m, d)), 4),
+                    'baseline': round(float(self.baseline[m, d]), 4),
+                    'ucl': round(float(self.ucl[m, d]), 4),
+                    'last_p': round(float(self.last_p[m, d]), 4),
+                    'cusum': round(float(self.cusum[m, d]), 2),
+                    'state': (f'warm-up {self._base_n[m].min()}/{self.warmup}' if warming
+                              else 'ALARM' if self.alarm[m, d] else 'ok'),
+                })
+        return pd.DataFrame(rows, columns=['machine', 'defect_type', 'parts', 'window_rate', 'baseline',
+                                           'ucl', 'last_p', 'cusum', 'state'])
+
+    def chart(self, machine, defect_type):
+        """p-chart points for one key: subgroup time, proportion, baseline and UCL."""
+        m, d = self.machines.index(machine), self.defect_classes.index(defect_type)
+        return pd.DataFrame({
+            'time': [datetime.fromtimestamp(ts) for ts, _ in self.points[m]],
+            'p': [p[d] for _, p in self.points[m]],
+            'baseline': self.baseline[m, d], 'ucl': self.ucl[m, d],
+        })
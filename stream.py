@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+from collections import deque
+from lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+
+# Frames waiting for inference; anything older is dropped rather than queued
+STREAM_QUEUE = 2
+# Results waiting for the UI to drain them, and how long the stream keeps
+# going when nobody drains them (view left, tab closed) before it releases
+# the source. Background tabs may only poll once a minute.
+STREAM_RESULTS = 1000
+STREAM_IDLE_TIMEOUT = float(os.environ.get('STEELSENSE_STREAM_IDLE_TIMEOUT', 120))
+FPS_WINDOW = 2.0
+
+
+def open_capture(source):
+    """``cv2.VideoCapture`` for a file path, RTSP/HTTP URL or USB camera index."""
+    if isinstance(source, str) and source.strip().isdigit():
+        source = int(source)
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video source: {source}")
+    return cap
+
+
+class FrameStream:
+    """Continuous inspection of a video source.
+
+    A reader thread pulls frames from OpenCV into a bounded queue; when
+    inference falls behind, the oldest queued frame is dropped so results
+    always describe what is on the line now. An inference worker runs
+    ``detect_fn`` (a list of RGB frames -> list of detection lists) on
+    the newest frames and publishes results for the UI to ``drain``.
+
+    ``every_n`` skips frames at the reader without decoding them. With a
+    ``gate`` (see ``gate.ChangeGate``), frames showing the part already
+    inspected, or an empty belt, skip the detector and are not published,
+    so each part is counted once. Until the gate knows the empty belt, a
+    frame with no detections may be the belt itself, so it is shown but
+    not published as a part. Video files are paced to their native
+    frame rate unless ``realtime`` is False, so a file behaves like the
+    camera it was recorded from.
+
+    At most ``max_results`` undrained results are kept (older ones are
+    counted as ``lost``), and the stream stops by itself when ``drain`` has
+    not been called for ``idle_timeout`` seconds.
+    """
+
+    def __init__(self, source, detect_fn, every_n=1, queue_size=STREAM_QUEUE, realtime=None, gate=None,
+                 max_results=STREAM_RESULTS, idle_timeout=STREAM_IDLE_TIMEOUT):
+        self.source = source
+        self.detect_fn = detect_fn
+        self.every_n = max(int(every_n), 1)
+        self.gate = gate
+        self.realtime = realtime if realtime is not None else isinstance(source, str) and os.path.isfile(source)
+        self.error = None
+        self.read = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.inferred = 0
+        self.gated = 0
+        self.uncounted = 0
+        self.lost = 0
+        self.idle_timeout = idle_timeout
+        self.abandoned = False
+        self.latest = None
+        self._cap = open_capture(source)
+        self._fps = self._cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self._queue = deque(maxlen=queue_size)
+        self._results = deque(maxlen=max_results)
+        self._last_drain = time.monotonic()
+        self._done_times = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._eof = False
+        self.started = time.perf_counter()
+        self._reader = threading.Thread(target=self._read_loop, name='stream-reader', daemon=True)
+        self._worker = threading.Thread(target=self._infer_loop, name='stream-infer', daemon=True)
+        self._reader.start()
+        self._worker.start()
+
+    @property
+    def running(self):
+        return self._worker.is_alive()
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._worker.join(timeout=5)
+        self._reader.join(timeout=5)
+
+    def _read_loop(self):
+        interval = 1.0 / self._fps if self.realtime and self._fps > 0 else 0.0
+        next_due = time.perf_counter()
+        try:
+            n = 0
+            while not self._stop.is_set():
+                if interval:
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_due += interval
+                n += 1
+                if n % self.every_n:
+                    # grab() advances without decoding the skipped frame
+                    if not self._cap.grab():
+                        break
+                    self.skipped += 1
+                    continue
+                start = time.perf_counter()
+                ok, frame = self._cap.read()
+                if not ok:
+                    break
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+                decode_ms = (time.perf_counter() - start) * 1000
+                with self._cond:
+                    self.read += 1
+                    if len(self._queue) == self._queue.maxlen:
+                        self.dropped += 1
+                    self._queue.append((frame, decode_ms))
+                    self._cond.notify()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._cap.release()
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+
+    def _infer_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._eof and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set() or not self._queue:
+                    return
+                if time.monotonic() - self._last_drain > self.idle_timeout:
+                    # Nobody is reading the results any more; stop and let the reader release the source
+                    self.abandoned = True
+                    self._stop.set()
+                    return
+                frame, decode_ms = self._queue.popleft()
+            if self.gate is not None:
+                verdict = self.gate.check(frame)
+                if verdict != 'new':
+                    with self._cond:
+                        self.gated += 1
+                        prev = self.latest[1] if verdict == 'same' and self.latest is not None else []
+                        self.latest = (frame, prev)
+                    continue
+            start = time.perf_counter()
+            try:
+                detections = self.detect_fn([frame])[0]
+            except Exception as e:
+                self.error = str(e)
+                self._stop.set()
+                return
+            now = time.perf_counter()
+            with self._cond:
+                self.inferred += 1
+                self.latest = (frame, detections)
+                if not detections and self.gate is not None and self.gate.background is None:
+                    self.uncounted += 1
+                else:
+                    if len(self._results) == self._results.maxlen:
+                        self.lost += 1
+                    self._results.append({'detections': detections,
+                                          'timings': {'decode': decode_ms, 'detect': (now - start) * 1000}})
+                self._done_times.append(now)
+                while self._done_times and now - self._done_times[0] > FPS_WINDOW:
+                    self._done_times.popleft()
+
+    def drain(self):
+        """Results published since the last call, oldest first."""
+        with self._cond:
+            out = list(self._results)
+            self._results.clear()
+            self._last_drain = time.monotonic()
+        return out
+
+    def stats(self):
+        """Achieved inference FPS (recent and overall), drop rate and frame counters.
+
+        ``gated`` frames were judged unchanged by the gate and never reached the detector;
+        ``uncounted`` ones had no detections while the empty belt was still unknown;
+        ``lost`` results were dropped because nobody drained them.
+        """
+        with self._cond:
+            now = time.perf_counter()
+            recent = len(self._done_times)
+            span = now - self._done_times[0] if recent > 1 else 0.0
+            return {
+                'fps': (recent - 1) / span if span > 0 else 0.0,
+                'avg_fps': self.inferred / max(now - self.started, 1e-9),
+                'source_fps': self._fps,
+                'read': self.read,
+                'skipped': self.skipped,
+                'dropped': self.dropped,
+                'inferred': self.inferred,
+                'gated': self.gated,
+                'uncounted': self.uncounted,
+                'lost': self.lost,
+                'drop_rate': self.dropped / self.read if self.read else 0.0,
+            }
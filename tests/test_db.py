@@ -0,0 +1,108 @@
+"""SupabaseWriter against a local PostgREST stand-in: bulk insert, dead-lettering and journal replay."""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import SupabaseWriter  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        rows = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.posts += 1
+            server.clients.add(self.client_address)
+            status = server.status
+            if status < 300:
+                server.rows.extend(rows)
+        body = b'' if status < 300 else b'{"message": "stub error"}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SupabaseWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.status = 201
+        self.server.rows = []
+        self.server.posts = 0
+        self.server.clients = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.tmp.name, 'journal.jsonl')
+        self.dead_letter = os.path.join(self.tmp.name, 'rejected.jsonl')
+        self.writer = SupabaseWriter(f'http://127.0.0.1:{self.server.server_port}', 'key',
+                                     journal_path=self.journal, dead_letter_path=self.dead_letter,
+                                     batch_size=200, backoff=0.01, max_retries=2, probe_interval=0.1)
+
+    def tearDown(self):
+        self.writer.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def submit(self, start, stop):
+        for i in range(start, stop):
+            self.writer.submit({'i': i})
+        self.writer.flush()
+
+    def read_lines(self, path):
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_bulk_insert(self):
+        self.submit(0, 500)
+        self.assertEqual(sorted(r['i'] for r in self.server.rows), list(range(500)))
+        self.assertEqual(self.writer.sent, 500)
+        # Batched, over one keep-alive connection
+        self.assertLessEqual(self.server.posts, 10)
+        self.assertEqual(len(self.server.clients), 1)
+        self.assertEqual(self.writer.journaled, 0)
+
+    def test_client_error_is_dead_lettered(self):
+        self.server.status = 401
+        self.submit(0, 5)
+        self.assertEqual(self.writer.rejected, 5)
+        self.assertEqual(self.writer.journaled, 0)
+        self.assertTrue(self.writer.online)
+        self.assertIn('401', self.writer.last_error)
+        self.assertEqual([r['i'] for r in self.read_lines(self.dead_letter)], list(range(5)))
+        self.assertFalse(os.path.exists(self.journal))
+        # Rejected rows are not retried once the server accepts again
+        self.server.status = 201
+        self.submit(5, 6)
+        self.assertEqual([r['i'] for r in self.server.rows], [5])
+
+    def test_server_error_is_journaled_and_replayed(self):
+        self.server.status = 503
+        self.submit(0, 20)
+        self.assertFalse(self.writer.online)
+        self.assertEqual(self.writer.journaled, 20)
+        self.assertEqual(len(self.read_lines(self.journal)), 20)
+        self.server.status = 201
+        deadline = time.monotonic() + 5
+        while self.writer.journaled and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.writer.journaled, 0)
+        self.assertTrue(self.writer.online)
+        self.assertEqual(sorted(r['i'] for r in self.server.rows), list(range(20)))
+        self.assertFalse(os.path.exists(self.journal))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+from itertools import islice
+import numpy as np
+
+# Sidebar defaults; TILE_SIZE matches the detector's input size
+TILE_SIZE = 640
+TILE_OVERLAP = 0.2
+NMS_IOU = 0.5
+
+
+def tile_origins(length, tile, step):
+    """Start offsets along one axis; the last tile is flush with the far edge."""
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)
+    return starts
+
+
+def iter_tiles(image_array, tile=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Yield ``(view, (x, y))`` for overlapping ``tile``×``tile`` windows, row by row.
+
+    Tiles are slices of ``image_array``, so nothing is copied until the
+    detector letterboxes them.
+    """
+    h, w = image_array.shape[:2]
+    step = max(int(tile * (1 - overlap)), 1)
+    for y in tile_origins(h, tile, step):
+        for x in tile_origins(w, tile, step):
+            yield image_array[y:y + tile, x:x + tile], (x, y)
+
+
+def nms(boxes, scores, classes, iou=NMS_IOU):
+    """Class-aware greedy non-maximum suppression; returns kept indices by descending score."""
+    if len(boxes) == 0:
+        return np.empty(0, np.int64)
+    # Offset each class into its own coordinate range so one pass never merges across classes
+    shifted = boxes + (classes * (boxes.max() + 1))[:, None]
+    x1, y1, x2, y2 = shifted.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        ih = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = iw * ih
+        order = rest[inter / (areas[i] + areas[rest] - inter + 1e-9) <= iou]
+    return np.array(keep, np.int64)
+
+
+def detect_tiled(detect_batch, image_array, tile=TILE_SIZE, overlap=TILE_OVERLAP, batch_size=8, iou=NMS_IOU):
+    """Run ``detect_batch`` over overlapping tiles and merge the results in frame coordinates.
+
+    Tiles are generated lazily and sent ``batch_size`` at a time, so only
+    one batch of tiles is in flight however large the scan is. Duplicate
+    boxes from the overlaps are merged with per-class NMS.
+    """
+    boxes, scores, names = [], [], []
+    tiles = iter_tiles(image_array, tile, overlap)
+    while True:
+        batch = list(islice(tiles, batch_size))
+        if not batch:
+            break
+        for dets, (_, (x, y)) in zip(detect_batch([view for view, _ in batch]), batch):
+            for d in dets:
+                x1, y1, x2, y2 = d['bbox']
+                boxes.append((x1 + x, y1 + y, x2 + x, y2 + y))
+                scores.append(d['confidence'])
+                names.append(d['class'])
+    if not boxes:
+        return []
+    boxes = np.array(boxes, np.float64)
+    scores = np.array(scores, np.float64)
+    labels, classes = np.unique(names, return_inverse=True)
+    return [{'class': str(labels[classes[i]]), 'confidence': float(scores[i]),
+             'bbox': tuple(int(v) for v in boxes[i])}
+            for i in nms(boxes, scores, classes, iou)]
@@ -0,0 +1,72 @@
+import csv
+import io
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+
+STAGES = ['decode', 'detect', 'draw', 'inpaint', 'pdf', 'db']
+
+
+class StageTimer:
+    """Collects wall-clock milliseconds per pipeline stage for one inspection."""
+
+    def __init__(self, timings=None):
+        self.timings = {} if timings is None else timings
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name, ms):
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+
+
+class LatencyLog:
+    """Bounded history of per-inspection stage timings."""
+
+    def __init__(self, maxlen=10000):
+        self._rows = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def record(self, timings, source='single', cached=False):
+        row = {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'source': source, 'cached': cached}
+        row.update({s: round(timings[s], 3) if s in timings else None for s in STAGES})
+        row['total'] = round(sum(timings.get(s, 0.0) for s in STAGES), 3)
+        with self._lock:
+            self._rows.append(row)
+
+    def summary(self):
+        """p50/p95/mean in ms for every stage that has samples."""
+        with self._lock:
+            rows = list(self._rows)
+        out = []
+        for stage in STAGES + ['total']:
+            vals = np.array([r[stage] for r in rows if r[stage] is not None], float)
+            if len(vals):
+                p50, p95 = np.percentile(vals, [50, 95])
+                out.append({'stage': stage, 'n': len(vals), 'p50_ms': round(p50, 1),
+                            'p95_ms': round(p95, 1), 'mean_ms': round(vals.mean(), 1)})
+        return out
+
+    def to_csv(self):
+        with self._lock:
+            rows = list(self._rows)
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=['time', 'source', 'cached'] + STAGES + ['total'])
+        writer.writeheader()
+        writer.writerows(rows)
+        return buf.getvalue()
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()